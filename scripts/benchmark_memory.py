@@ -0,0 +1,73 @@
+"""
+Memory used by each Request and WebSocket object.
+
+    PYTHONPATH=. python scripts/benchmark_memory.py
+
+Scopes are created before measuring, so only the objects Yaat creates
+for the connection are counted.
+"""
+import tracemalloc
+
+from yaat.requests import Request
+from yaat.websockets import WebSocket
+
+COUNT = 10000
+
+
+def make_scope(scope_type: str) -> dict:
+    return {
+        "type": scope_type,
+        "method": "GET",
+        "scheme": "http",
+        "server": ("testserver", 80),
+        "client": ("127.0.0.1", 50000),
+        "root_path": "",
+        "path": "/items/1",
+        "query_string": b"page=1&tag=a&tag=b",
+        "headers": [
+            (b"host", b"testserver"),
+            (b"accept", b"application/json"),
+            (b"cookie", b"session=abc; theme=dark"),
+        ],
+    }
+
+
+async def receive():
+    return {}
+
+
+async def send(message):
+    pass
+
+
+def measure(name: str, create: callable, load: callable = None):
+    scopes = [make_scope(name) for _ in range(COUNT)]
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    objects = [create(scope) for scope in scopes]
+    created, _ = tracemalloc.get_traced_memory()
+    if load is not None:
+        for connection in objects:
+            load(connection)
+    loaded, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{name}: {(created - before) / COUNT:.0f} bytes each", end="")
+    print(f", {(loaded - before) / COUNT:.0f} bytes with parsed properties")
+
+
+def load_connection(connection):
+    connection.url
+    connection.headers.get("accept")
+    connection.query_params.getlist("tag")
+    connection.cookies
+
+
+if __name__ == "__main__":
+    measure("http", lambda scope: Request(scope, receive), load_connection)
+    measure(
+        "websocket",
+        lambda scope: WebSocket(scope, receive, send),
+        load_connection,
+    )
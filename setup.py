@@ -26,7 +26,6 @@ setup(
         "aiofiles",
         "httpx",
         "Jinja2",
-        "parse",
         "python-multipart",
     ],
     classifiers=[
@@ -0,0 +1,65 @@
+import pytest
+
+from yaat.middleware import ASGIMiddleware, BaseMiddleware
+from yaat.responses import Response, TextResponse
+
+
+class HeaderMiddleware(ASGIMiddleware):
+    async def __call__(self, scope, receive, send):
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"].append((b"x-asgi", b"true"))
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+class BodyMiddleware(BaseMiddleware):
+    async def process_response(self, response: Response):
+        response.body = b"modified body"
+
+
+class PlainASGIMiddleware:
+    # ASGI middleware from other libraries do not subclass ASGIMiddleware
+    def __init__(self, app, name):
+        self.app = app
+        self.name = name
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            scope["server"] = (self.name, 80)
+        await self.app(scope, receive, send)
+
+
+@pytest.mark.asyncio
+async def test_asgi_middleware_with_base_middleware(app, client):
+    app.add_middleware(HeaderMiddleware)
+    app.add_middleware(BodyMiddleware)
+
+    @app.route("/")
+    async def handler(request):
+        return TextResponse("hello world")
+
+    res = await client.get("/")
+
+    assert res.text == "modified body"
+    assert res.headers["x-asgi"] == "true"
+
+
+@pytest.mark.asyncio
+async def test_asgi_middleware_asgi_route(app, client):
+    app.add_middleware(HeaderMiddleware)
+    app.add_middleware(PlainASGIMiddleware, name="asgiserver")
+
+    @app.asgi_route("/raw")
+    async def raw(scope, receive, send):
+        body = scope["server"][0].encode()
+        await send(
+            {"type": "http.response.start", "status": 200, "headers": []}
+        )
+        await send({"type": "http.response.body", "body": body})
+
+    res = await client.get("/raw")
+
+    assert res.text == "asgiserver"
+    assert res.headers["x-asgi"] == "true"
@@ -1,8 +1,10 @@
 import pytest
 
-from yaat.middleware import BaseMiddleware
+from yaat.middleware import BaseMiddleware, ExceptionMiddleware
+from yaat.middleware.base import MiddlewarePipeline
 from yaat.requests import Request
 from yaat.responses import TextResponse, Response
+from yaat.routing import Router
 
 
 class CustomMiddleware(BaseMiddleware):
@@ -25,3 +27,132 @@ async def test_base_middleware_plain_text_response(app, client):
     res = await client.get("/")
 
     assert res.text == "modified body"
+
+
+class HeaderMiddleware(BaseMiddleware):
+    name = "route"
+
+    async def process_response(self, response: Response):
+        # keep the order middlewares are run
+        names = response.headers.get("x-middleware")
+        response.headers["x-middleware"] = (
+            f"{names},{self.name}" if names else self.name
+        )
+
+
+class RouterHeaderMiddleware(HeaderMiddleware):
+    name = "router"
+
+
+class ParentHeaderMiddleware(HeaderMiddleware):
+    name = "parent"
+
+
+@pytest.mark.asyncio
+async def test_base_middleware_route_level(app, client):
+    @app.route("/hello/{name}", middlewares=[HeaderMiddleware])
+    async def handler(request, name):
+        return TextResponse(f"hello {name}")
+
+    @app.route("/fast")
+    async def fast_handler(request):
+        return TextResponse("fast")
+
+    res = await client.get("/hello/yaat")
+    assert res.text == "hello yaat"
+    assert res.headers["x-middleware"] == "route"
+
+    res = await client.get("/fast")
+    assert res.text == "fast"
+    assert "x-middleware" not in res.headers
+
+
+@pytest.mark.asyncio
+async def test_base_middleware_router_level(app, client):
+    parent = Router(middlewares=[ParentHeaderMiddleware])
+    router = Router(middlewares=[RouterHeaderMiddleware])
+
+    @router.route("/hello", middlewares=[HeaderMiddleware])
+    async def handler(request):
+        return TextResponse("hello")
+
+    @parent.route("/parent")
+    async def parent_handler(request):
+        return TextResponse("parent")
+
+    @app.route("/")
+    async def index_handler(request):
+        return TextResponse("index")
+
+    parent.mount(router, prefix="/router")
+    app.mount(parent, prefix="/parent")
+
+    # inner middlewares process response first
+    res = await client.get("/parent/router/hello")
+    assert res.text == "hello"
+    assert res.headers["x-middleware"] == "route,router,parent"
+
+    res = await client.get("/parent/parent")
+    assert res.headers["x-middleware"] == "parent"
+
+    res = await client.get("/")
+    assert "x-middleware" not in res.headers
+
+
+@pytest.mark.asyncio
+async def test_base_middleware_compiled_pipeline(app, client):
+    calls = []
+
+    class FirstMiddleware(BaseMiddleware):
+        async def process_request(self, request: Request):
+            calls.append("first request")
+
+        async def process_response(self, response: Response):
+            calls.append("first response")
+
+    class SecondMiddleware(BaseMiddleware):
+        async def process_request(self, request: Request):
+            calls.append("second request")
+
+    class ThirdMiddleware(BaseMiddleware):
+        async def process_response(self, response: Response):
+            calls.append("third response")
+
+    class NoopMiddleware(BaseMiddleware):
+        pass
+
+    app.add_middleware(FirstMiddleware)
+    app.add_middleware(NoopMiddleware)
+    app.add_middleware(SecondMiddleware)
+    app.add_middleware(ThirdMiddleware)
+
+    @app.route("/")
+    async def handler(request):
+        calls.append("handler")
+        return TextResponse("hello world")
+
+    await client.get("/")
+    nested_calls = list(calls)
+    calls.clear()
+
+    app.freeze()
+    pipeline = app.middleware.app
+    assert isinstance(pipeline, MiddlewarePipeline)
+    assert len(pipeline.request_hooks) == 2
+    assert len(pipeline.response_hooks) == 2
+    # middleware handling the request itself is kept
+    assert isinstance(pipeline.app, ExceptionMiddleware)
+
+    res = await client.get("/")
+    assert res.text == "hello world"
+    assert (
+        calls
+        == nested_calls
+        == [
+            "second request",
+            "first request",
+            "handler",
+            "first response",
+            "third response",
+        ]
+    )
@@ -1,6 +1,8 @@
 import pytest
 
 from yaat import Yaat
+from yaat.middleware import CORSMiddleware
+from yaat.responses import TextResponse
 
 
 @pytest.mark.asyncio
@@ -141,3 +143,37 @@ async def test_lifespan_middleware_raise_on_shutdown():
 
     assert ran_shutdown
     assert shutdown_failed
+
+
+@pytest.mark.asyncio
+async def test_lifespan_middleware_freeze_on_startup():
+    async def handler(request):
+        return TextResponse("hello world")
+
+    def startup():
+        # routes can still be added by startup handlers
+        app.add_route("/", handler)
+
+    app = Yaat(on_startup=[startup])
+
+    # mock async scope, receive, send
+    asgi_scope = {"type": "lifespan"}
+    messages = ["lifespan.startup", "lifespan.shutdown"]
+
+    async def asgi_receive(*args, **kwargs):
+        return {"type": messages.pop(0)}
+
+    async def asgi_send(*args, **kwargs):
+        pass
+
+    await app(asgi_scope, asgi_receive, asgi_send)
+
+    assert app.frozen
+    assert app.router.frozen
+    assert app.router.paths == ["/"]
+
+    with pytest.raises(RuntimeError):
+        app.add_route("/new", handler)
+
+    with pytest.raises(RuntimeError):
+        app.add_middleware(CORSMiddleware)
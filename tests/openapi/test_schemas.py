@@ -1,4 +1,5 @@
 import pytest
+import yaml
 
 from yaat import Yaat
 from yaat.openapi import OpenAPISchema, get_swagger_ui
@@ -295,3 +296,23 @@ async def test_schemas_swagger_ui(app, client):
     assert res.status_code == 200
     assert "text/html" in res.headers["content-type"]
     assert '<div id="swagger-ui"></div>' in res.text
+
+
+def test_schemas_generated_on_freeze(app):
+    api_schema = OpenAPISchema("Yaat", app=app)
+    register_routes(app)
+    app.freeze()
+
+    assert api_schema.frozen_schemas[app.router] == JSON_API_SCHEMA
+
+    async def invalid(request):
+        """
+        responses: [
+        """
+
+    # invalid docstring fails on startup
+    other = Yaat()
+    OpenAPISchema("Yaat", app=other)
+    other.add_route("/invalid", invalid, has_schema=True)
+    with pytest.raises(yaml.YAMLError):
+        other.freeze()
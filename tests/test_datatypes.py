@@ -45,6 +45,28 @@ async def test_datatypes_url_from_scope():
     assert url.query == "xyz=123"
 
 
+@pytest.mark.asyncio
+async def test_datatypes_url_lazy():
+    # components are read from scope only when accessed
+    url = URL(scope={"path": "/path/to/somewhere"})
+    assert url.path == "/path/to/somewhere"
+
+    headers = Headers([(b"host", b"example.com:8080")])
+    url = URL(
+        scope={
+            "scheme": "https",
+            "server": ("127.0.0.1", 8000),
+            "path": "/path",
+            "query_string": b"",
+            "headers": [],
+        },
+        headers=headers,
+    )
+
+    assert url.host_header == headers.host == "example.com:8080"
+    assert url == "https://example.com:8080/path"
+
+
 @pytest.mark.asyncio
 async def test_datatypes_address():
     address = Address("example.com", "8080")
@@ -85,13 +107,35 @@ async def test_datatypes_queryparams(app, client):
     assert "a" in query
     assert "y" not in query
     assert "z" not in query
-    assert query.get("a") == ["123", "456"]
+    assert query.get("a") == "123"
+    assert query.getlist("a") == ["123", "456"]
+    assert query.getlist("y") == []
     assert query["b"] == "789"
-    assert dict(query) == {"a": ["123", "456"], "b": "789", "c": ""}
+    assert dict(query) == {"a": "123", "b": "789", "c": ""}
+    assert list(query.items(multi=True)) == [
+        ("a", "123"),
+        ("a", "456"),
+        ("b", "789"),
+        ("c", ""),
+    ]
     assert list(query.keys()) == ["a", "b", "c"]
     assert str(query) == "a=123&a=456&b=789&c"
 
 
+@pytest.mark.asyncio
+async def test_datatypes_queryparams_serialize():
+    query = QueryParams(
+        [("q", "hello world"), ("next", "/path?a=1&b=2"), ("name", "世界")]
+    )
+
+    assert query["q"] == "hello world"
+    assert (
+        str(query)
+        == "q=hello+world&next=%2Fpath%3Fa%3D1%26b%3D2&name=%E4%B8%96%E7%95%8C"
+    )
+    assert QueryParams(str(query)) == query
+
+
 @pytest.mark.asyncio
 async def test_datatypes_url_blank_params():
     query = QueryParams("a=123&b=456&abc&xyz")
@@ -117,7 +161,32 @@ async def test_datatypes_form(app, client):
     assert "xyz" in form
     assert "def" in form
     assert "hij" not in form
-    assert form.get("abc") == ["123", "456"]
+    assert form.get("abc") == "123"
+    assert form.getlist("abc") == ["123", "456"]
     assert form.get("def") == "789"
     assert form["xyz"] == upload
-    assert dict(form) == {"abc": ["123", "456"], "def": "789", "xyz": upload}
+    assert dict(form) == {"abc": "123", "def": "789", "xyz": upload}
+
+
+@pytest.mark.asyncio
+async def test_datatypes_headers_multiple_values():
+    raw_headers = [
+        (b"accept", b"text/html"),
+        (b"x-forwarded-for", b"10.0.0.1"),
+        (b"x-forwarded-for", b"10.0.0.2"),
+    ]
+    header = Headers(raw_headers)
+
+    # raw headers are kept as they are
+    assert header.raw is raw_headers
+    assert "Accept" in header
+    assert header["ACCEPT"] == "text/html"
+    assert header.get("X-Forwarded-For") == "10.0.0.1"
+    assert header.getlist("x-forwarded-for") == ["10.0.0.1", "10.0.0.2"]
+    assert header.getlist("xyz") == []
+    assert header.get("xyz", "default") == "default"
+    assert len(header) == 2
+    assert list(header) == ["accept", "x-forwarded-for"]
+
+    with pytest.raises(KeyError):
+        header["xyz"]
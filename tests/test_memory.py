@@ -0,0 +1,117 @@
+import asyncio
+import pytest
+
+from yaat import Yaat
+from yaat.components import UploadFile
+from yaat.memory import body_memory
+from yaat.responses import TextResponse
+
+
+@pytest.fixture
+def memory_limit():
+    body_memory.peak = body_memory.in_use
+    yield body_memory
+    body_memory.limit = None
+    body_memory.timeout = 30
+    body_memory.peak = 0
+
+
+@pytest.mark.asyncio
+async def test_memory_body_released(app, client, memory_limit):
+    @app.route("/", methods=["POST"])
+    async def handler(request):
+        body = await request.body()
+        assert body_memory.in_use >= len(body)
+        return TextResponse(body)
+
+    res = await client.post("/", data=b"x" * 1000)
+
+    assert res.text == "x" * 1000
+    assert body_memory.in_use == 0
+    assert body_memory.metrics()["peak"] >= 1000
+
+
+@pytest.mark.asyncio
+async def test_memory_body_larger_than_limit(app, client, memory_limit):
+    body_memory.limit = 4
+    body_memory.timeout = 0.01
+
+    @app.route("/", methods=["POST"])
+    async def handler(request):
+        return TextResponse(await request.body())
+
+    # request does not wait for the memory it holds
+    res = await client.post("/", data=b"hello!")
+    assert res.text == "hello!"
+    assert body_memory.in_use == 0
+
+
+@pytest.mark.asyncio
+async def test_memory_body_counted_once(app, client, memory_limit):
+    @app.route("/", methods=["POST"])
+    async def handler(request):
+        return TextResponse(await request.body())
+
+    res = await client.post("/", data=b"body")
+    assert res.text == "body"
+    assert body_memory.peak == 4
+
+
+@pytest.mark.asyncio
+async def test_memory_exhausted(app, client, memory_limit):
+    body_memory.limit = 100
+    body_memory.timeout = 0.01
+    body_memory.acquire(100)
+
+    @app.route("/", methods=["POST"])
+    async def handler(request):
+        return TextResponse(await request.body())
+
+    try:
+        res = await client.post("/", data=b"hello")
+        assert res.status_code == 503
+
+        # request continues once memory is released
+        body_memory.timeout = 1
+        loop = asyncio.get_running_loop()
+        loop.call_later(0.01, body_memory.release, 100)
+        res = await client.post("/", data=b"hello")
+        assert res.text == "hello"
+    finally:
+        body_memory.release(body_memory.in_use)
+
+
+@pytest.mark.asyncio
+async def test_memory_upload_file_spill(memory_limit):
+    upload = UploadFile("file.txt")
+    await upload.write(b"hello")
+    assert upload.spooled
+    assert body_memory.in_use == 5
+
+    # written to disk once memory is used up
+    body_memory.limit = 5
+    await upload.write(b"world")
+    assert not upload.spooled
+    assert body_memory.in_use == 0
+
+    await upload.seek(0)
+    assert await upload.read() == b"helloworld"
+    await upload.close()
+
+
+@pytest.mark.asyncio
+async def test_memory_cancel_on_disconnect(memory_limit):
+    body_memory.limit = 10
+    body_memory.timeout = 0.01
+    app = Yaat(cancel_on_disconnect=True)
+
+    @app.route("/", methods=["POST"])
+    async def handler(request):
+        # body is already received while the handler waits
+        await asyncio.sleep(0.05)
+        return TextResponse(await request.body())
+
+    # request does not wait for the memory of its received body
+    res = await app.test_client().post("/", data=b"x" * 20)
+    assert res.text == "x" * 20
+    assert body_memory.in_use == 0
@@ -1,7 +1,14 @@
+import asyncio
+import io
 import pytest
 
 from yaat import Yaat
+from yaat.components import UploadFile
+from yaat.memory import body_memory
+from yaat.middleware import BaseMiddleware
+from yaat.requests import Request
 from yaat.responses import JSONResponse, TextResponse
+from yaat.routing import Router
 
 
 @pytest.mark.asyncio
@@ -69,6 +76,94 @@ async def test_requests_body(app, client):
     assert res.content == b'{"body":"hello=world"}'
 
 
+@pytest.mark.asyncio
+async def test_requests_body_buffer(app, client):
+    @app.route("/", methods=["POST"])
+    async def handler(request):
+        view = await request.body_view()
+        assert view.readonly
+        assert bytes(view) == b"hello world"
+        body = await request.body()
+        assert isinstance(body, bytes)
+        return TextResponse(body.decode())
+
+    res = await client.post("/", data=b"hello world")
+    assert res.text == "hello world"
+
+    # Content-Length larger than the body sent
+    async def receive():
+        return {"type": "http.request", "body": b"hello", "more_body": False}
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "headers": [(b"content-length", b"20")],
+    }
+    request = Request(scope, receive)
+    assert await request.body() == b"hello"
+    request.release_memory()
+
+
+@pytest.mark.asyncio
+async def test_requests_body_into(app, client):
+    @app.route("/", methods=["POST"])
+    async def handler(request):
+        file = io.BytesIO()
+        size = await request.body_into(file)
+        return JSONResponse({"size": size, "body": file.getvalue().decode()})
+
+    res = await client.post("/", data=b"hello world")
+    assert res.json() == {"size": 11, "body": "hello world"}
+
+
+@pytest.mark.asyncio
+async def test_requests_stream_replay(app, client):
+    class SignatureMiddleware(BaseMiddleware):
+        async def process_request(self, request):
+            size = 0
+            async for chunk in request.stream(replay=True):
+                size += len(chunk)
+            request.scope["body_size"] = size
+
+    app.add_middleware(SignatureMiddleware)
+
+    @app.route("/", methods=["POST"])
+    async def handler(request):
+        form = await request.form()
+        size = request.scope["body_size"]
+        return JSONResponse({"size": size, "hello": form["hello"]})
+
+    res = await client.post("/", data={"hello": "world"})
+    assert res.json() == {"size": 11, "hello": "world"}
+    assert body_memory.in_use == 0
+
+
+@pytest.mark.asyncio
+async def test_requests_stream_replay_spool(monkeypatch):
+    monkeypatch.setattr(UploadFile, "SPOOL_MAX_SIZE", 10)
+    chunks = [b"hello ", b"world, ", b"hello again"]
+
+    async def receive():
+        body = chunks.pop(0)
+        return {"type": "http.request", "body": body, "more_body": chunks}
+
+    request = Request({"type": "http", "headers": []}, receive)
+
+    # first consumer stops before the body is fully received
+    async for chunk in request.stream(replay=True):
+        assert chunk == b"hello "
+        break
+
+    received = b"".join([chunk async for chunk in request.stream()])
+    assert received == b"hello world, hello again"
+    # large body is written to disk
+    assert not request._spool.spooled
+
+    assert await request.body() == b"hello world, hello again"
+    request.release_memory()
+    assert body_memory.in_use == 0
+
+
 @pytest.mark.asyncio
 async def test_requests_json(app, client):
     DATA = {"hello": "world", "hello_chinese": "世界"}
@@ -98,6 +193,29 @@ async def test_requests_form_urlencode(app, client):
     assert res.json() == DATA
 
 
+@pytest.mark.asyncio
+async def test_requests_cookies_parse(app, client):
+    @app.route("/")
+    async def handler(request):
+        return JSONResponse(dict(request.cookies))
+
+    res = await client.get(
+        "/",
+        headers={
+            "cookie": 'session=abc; theme="dark mode"; a@b=1; x=1; x=2; flag'
+        },
+    )
+
+    # malformed cookies are kept, first value of repeated cookie is used
+    assert res.json() == {
+        "session": "abc",
+        "theme": "dark mode",
+        "a@b": "1",
+        "x": "1",
+        "": "flag",
+    }
+
+
 @pytest.mark.asyncio
 async def test_requests_cookies(app, client):
     COOKIE_VALUE = "Hello cookie!"
@@ -119,3 +237,210 @@ async def test_requests_cookies(app, client):
 
     res = await client.get("/")
     assert res.text == COOKIE_VALUE
+
+
+@pytest.mark.asyncio
+async def test_requests_max_body_size():
+    app = Yaat(max_body_size=10)
+    client = app.test_client()
+    router = Router(max_body_size=20)
+
+    @app.route("/", methods=["POST"])
+    async def handler(request):
+        return TextResponse(await request.body())
+
+    @app.route("/large", methods=["POST"], max_body_size=100)
+    async def large_handler(request):
+        return TextResponse(await request.body())
+
+    @router.route("/", methods=["POST"])
+    async def router_handler(request):
+        return TextResponse(await request.body())
+
+    app.mount(router, prefix="/router")
+
+    res = await client.post("/", data=b"x" * 10)
+    assert res.text == "x" * 10
+
+    res = await client.post("/", data=b"x" * 11)
+    assert res.status_code == 413
+
+    res = await client.post("/large", data=b"x" * 100)
+    assert res.status_code == 200
+
+    res = await client.post("/router", data=b"x" * 20)
+    assert res.status_code == 200
+
+    res = await client.post("/router", data=b"x" * 21)
+    assert res.status_code == 413
+
+
+@pytest.mark.asyncio
+async def test_requests_max_body_size_streaming():
+    app = Yaat(max_body_size=10)
+
+    @app.route("/", methods=["POST"])
+    async def handler(request):
+        return TextResponse(await request.body())
+
+    # body without Content-Length is counted as it is received
+    chunks = [b"x" * 6, b"x" * 6, b"x" * 6]
+    received = []
+    sent = []
+
+    async def receive():
+        body = chunks.pop(0)
+        received.append(body)
+        return {"type": "http.request", "body": body, "more_body": True}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/",
+        "query_string": b"",
+        "headers": [],
+    }
+    await app(scope, receive, send)
+
+    assert sent[0]["status"] == 413
+    # the rest of the body is not received
+    assert len(received) == 2
+
+
+@pytest.mark.asyncio
+async def test_requests_is_disconnected():
+    messages = [
+        {"type": "http.request", "body": b"hello", "more_body": False},
+        {"type": "http.disconnect"},
+    ]
+
+    async def receive():
+        if not messages:
+            await asyncio.Event().wait()
+        return messages.pop(0)
+
+    request = Request({"type": "http", "headers": []}, receive)
+    # body received by the check is still streamed
+    assert not await request.is_disconnected()
+    assert await request.body() == b"hello"
+    assert await request.is_disconnected()
+    request.release_memory()
+
+    messages = []
+    request = Request({"type": "http", "headers": []}, receive)
+    assert not await request.is_disconnected()
+
+
+@pytest.mark.asyncio
+async def test_requests_cancel_on_disconnect():
+    app = Yaat(cancel_on_disconnect=True)
+    cleaned_up = False
+
+    @app.route("/", methods=["POST"])
+    async def handler(request):
+        nonlocal cleaned_up
+        assert await request.body() == b"hello"
+        try:
+            await asyncio.sleep(10)
+        finally:
+            cleaned_up = True
+        return TextResponse("too late")
+
+    @app.route("/fast", methods=["POST"])
+    async def fast(request):
+        return TextResponse(await request.body())
+
+    @app.route("/keep", methods=["POST"], cancel_on_disconnect=False)
+    async def keep(request):
+        await asyncio.sleep(0.01)
+        return TextResponse("kept")
+
+    def make_receive():
+        messages = [
+            {"type": "http.request", "body": b"hello", "more_body": False}
+        ]
+
+        async def receive():
+            if messages:
+                return messages.pop(0)
+            await asyncio.sleep(0.001)
+            return {"type": "http.disconnect"}
+
+        return receive
+
+    async def request(path):
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {
+            "type": "http",
+            "method": "POST",
+            "path": path,
+            "query_string": b"",
+            "headers": [],
+        }
+        await app(scope, make_receive(), send)
+        return sent
+
+    sent = await request("/")
+    assert sent[0]["status"] == 499
+    assert cleaned_up
+
+    # disconnect is received even if handler does not read the body
+    @app.route("/ignore", methods=["POST"])
+    async def ignore(request):
+        await asyncio.sleep(10)
+        return TextResponse("too late")
+
+    chunks = [b"hello", b" ", b"world"]
+
+    async def receive():
+        if chunks:
+            body = chunks.pop(0)
+            return {"type": "http.request", "body": body, "more_body": True}
+        await asyncio.sleep(0.001)
+        return {"type": "http.disconnect"}
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/ignore",
+        "query_string": b"",
+        "headers": [],
+    }
+    await asyncio.wait_for(app(scope, receive, send), 1)
+    assert sent[0]["status"] == 499
+    assert body_memory.in_use == 0
+
+    sent = await request("/fast")
+    assert sent[0]["status"] == 200
+    assert sent[1]["body"] == b"hello"
+
+    sent = await request("/keep")
+    assert sent[1]["body"] == b"kept"
+
+
+@pytest.mark.asyncio
+async def test_requests_cancel_on_disconnect_test_client():
+    app = Yaat(cancel_on_disconnect=True)
+    client = app.test_client()
+
+    @app.route("/", methods=["POST"])
+    async def handler(request):
+        await asyncio.sleep(0.01)
+        return TextResponse(await request.body())
+
+    # test client keeps sending empty body instead of disconnect
+    res = await client.post("/", data=b"hello")
+    assert res.text == "hello"
+    assert body_memory.in_use == 0
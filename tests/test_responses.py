@@ -1,3 +1,4 @@
+from http.cookies import CookieError
 import pytest
 import tempfile
 
@@ -192,6 +193,41 @@ async def test_responses_set_cookie(app, client):
     assert "mycookie=myvalue" in res.headers["set-cookie"]
 
 
+@pytest.mark.asyncio
+async def test_responses_set_multiple_cookies(app, client):
+    @app.route("/")
+    async def handler(request):
+        response = Response(content="hello world")
+        response.set_cookie(key="session", value="abc", httponly=True)
+        response.set_cookie(key="theme", value="dark mode", samesite=None)
+        return response
+
+    res = await client.get("/")
+
+    assert res.headers.getlist("set-cookie") == [
+        "session=abc; Path=/; HttpOnly; SameSite=lax",
+        'theme="dark mode"; Path=/',
+    ]
+    assert res.cookies["session"] == "abc"
+
+
+def test_responses_set_cookie_illegal():
+    response = Response()
+
+    with pytest.raises(CookieError):
+        response.set_cookie("a;b\r\nX-Evil", "v")
+    with pytest.raises(CookieError):
+        response.set_cookie("", "v")
+    with pytest.raises(CookieError):
+        response.set_cookie("name", "v", path="/; Secure")
+    with pytest.raises(CookieError):
+        response.set_cookie("name", "v", domain="example.com\r\nX-Evil: 1")
+    with pytest.raises(CookieError):
+        response.set_cookie("name", "v", expires="now;")
+
+    assert response.cookie_headers == []
+
+
 @pytest.mark.asyncio
 async def test_responses_delete_cookie(app, client):
     @app.route("/")
@@ -1,7 +1,9 @@
 from urllib.parse import unquote
+import uuid
 import pytest
 
 from yaat import Yaat
+from yaat.middleware import BaseMiddleware
 from yaat.responses import (
     JSONResponse,
     TextResponse,
@@ -211,3 +213,538 @@ async def test_routing_list_paths(app, client):
 
     assert "/" in routes
     assert "/list" in routes
+
+
+@pytest.mark.asyncio
+async def test_routing_url_param_single_segment(app, client):
+    @app.route("/users/{userid}")
+    async def user(request, userid):
+        return TextResponse(f"user {userid}")
+
+    @app.route("/users/{userid}/posts/{postid}")
+    async def post(request, userid, postid):
+        return TextResponse(f"user {userid} post {postid}")
+
+    @app.route("/files/{name}.txt")
+    async def text_file(request, name):
+        return TextResponse(f"file {name}")
+
+    res = await client.get("/users/john")
+    assert res.text == "user john"
+
+    res = await client.get("/users/john/posts/10")
+    assert res.text == "user john post 10"
+
+    res = await client.get("/files/readme.txt")
+    assert res.text == "file readme"
+
+    res = await client.get("/files/readme.md")
+    assert res.status_code == 404
+
+    res = await client.get("/users/john/comments")
+    assert res.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_routing_mount_nested_sub_application(app, client):
+    apiRouter = Router()
+    userRouter = Router()
+
+    @userRouter.route("/")
+    async def users(request):
+        return TextResponse("users")
+
+    @userRouter.route("/{userid}")
+    async def user(request, userid):
+        return TextResponse(f"user {userid}")
+
+    apiRouter.mount(prefix="/users", router=userRouter)
+    app.mount(prefix="/api", router=apiRouter)
+
+    res = await client.get("/api/users")
+    assert res.text == "users"
+
+    res = await client.get("/api/users/john")
+    assert res.text == "user john"
+
+    res = await client.get("/api")
+    assert res.status_code == 404
+
+    # routes added after mounting are still reachable
+    @userRouter.route("/{userid}/posts")
+    async def posts(request, userid):
+        return TextResponse(f"posts of {userid}")
+
+    res = await client.get("/api/users/john/posts")
+    assert res.text == "posts of john"
+
+
+def test_routing_list_paths_sub_application():
+    router = Router()
+    blogRouter = Router()
+
+    @router.route("/")
+    async def main(request):
+        return TextResponse("main route")
+
+    @blogRouter.route("/")
+    async def blog(request):
+        return TextResponse("blog route")
+
+    router.mount(prefix="/blog", router=blogRouter)
+
+    # added after mounting
+    @blogRouter.route("/posts")
+    async def posts(request):
+        return TextResponse("posts route")
+
+    assert router.paths == ["/", "/blog", "/blog/posts"]
+    assert blogRouter.paths == ["/", "/posts"]
+
+
+def test_routing_duplicate_paths():
+    router = Router()
+    blogRouter = Router()
+
+    async def handler(request):
+        return TextResponse("hello world")
+
+    router.add_route("/blog/posts", handler)
+    with pytest.raises(AssertionError):
+        router.add_route("/blog/posts/", handler)
+
+    blogRouter.add_route("/posts", handler)
+    with pytest.raises(AssertionError):
+        router.mount(prefix="/blog", router=blogRouter)
+
+    otherRouter = Router()
+    router.mount(prefix="/other", router=otherRouter)
+    otherRouter.add_route("/", handler)
+    with pytest.raises(AssertionError):
+        router.add_route("/other/", handler)
+
+
+@pytest.mark.asyncio
+async def test_routing_url_param_convertors(app, client):
+    @app.route("/numbers/{number}")
+    async def number(request, number: int):
+        return JSONResponse({"number": number})
+
+    @app.route("/prices/{price}", invalid_param_status=422)
+    async def price(request, price: float):
+        return JSONResponse({"price": price})
+
+    @app.route("/books/{bookid}", invalid_param_status=404)
+    class Book:
+        async def get(self, request, bookid: int):
+            return JSONResponse({"bookid": bookid})
+
+    res = await client.get("/numbers/10")
+    assert res.json() == {"number": 10}
+
+    # fall back to string
+    res = await client.get("/numbers/ten")
+    assert res.json() == {"number": "ten"}
+
+    res = await client.get("/prices/9.5")
+    assert res.json() == {"price": 9.5}
+
+    res = await client.get("/prices/free")
+    assert res.status_code == 422
+
+    res = await client.get("/books/1")
+    assert res.json() == {"bookid": 1}
+
+    res = await client.get("/books/first")
+    assert res.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_routing_path_convertors(app, client):
+    @app.route("/items/{itemid:int}")
+    async def item(request, itemid):
+        return JSONResponse({"type": "item", "itemid": itemid})
+
+    @app.route("/items/{name}")
+    async def item_by_name(request, name):
+        return JSONResponse({"type": "name", "name": name})
+
+    @app.route("/prices/{price:float}")
+    async def price(request, price):
+        return JSONResponse({"price": price})
+
+    @app.route("/orders/{orderid:uuid}")
+    async def order(request, orderid):
+        assert isinstance(orderid, uuid.UUID)
+        return JSONResponse({"orderid": str(orderid)})
+
+    @app.route("/files/{filepath:path}")
+    async def download(request, filepath):
+        return JSONResponse({"filepath": filepath})
+
+    @app.route("/v{version:int}/status")
+    async def status(request, version):
+        return JSONResponse({"version": version})
+
+    res = await client.get("/items/10")
+    assert res.json() == {"type": "item", "itemid": 10}
+
+    # invalid integer falls through to the next route
+    res = await client.get("/items/abc")
+    assert res.json() == {"type": "name", "name": "abc"}
+
+    res = await client.get("/prices/1.5")
+    assert res.json() == {"price": 1.5}
+
+    res = await client.get("/prices/free")
+    assert res.status_code == 404
+
+    orderid = uuid.uuid4()
+    res = await client.get(f"/orders/{orderid}")
+    assert res.json() == {"orderid": str(orderid)}
+
+    res = await client.get("/orders/123")
+    assert res.status_code == 404
+
+    res = await client.get("/files/images/logo.png")
+    assert res.json() == {"filepath": "images/logo.png"}
+
+    # path does not match empty rest of the path
+    res = await client.get("/files")
+    assert res.status_code == 404
+    res = await client.get("/files/")
+    assert res.status_code == 404
+
+    res = await client.get("/v2/status")
+    assert res.json() == {"version": 2}
+
+    res = await client.get("/vx/status")
+    assert res.status_code == 404
+
+
+def test_routing_invalid_path_convertors():
+    router = Router()
+
+    async def handler(request):
+        return TextResponse("hello world")
+
+    with pytest.raises(AssertionError):
+        router.add_route("/{name:unknown}", handler)
+
+    with pytest.raises(AssertionError):
+        router.add_route("/{filepath:path}/download", handler)
+
+
+@pytest.mark.asyncio
+async def test_routing_invalid_method_allow_header(app, client):
+    @app.route("/", methods=["GET", "POST"])
+    async def handler(request):
+        return TextResponse("hello world")
+
+    @app.route("/books")
+    class Books:
+        async def get(self, request):
+            return TextResponse("This is get method.")
+
+        async def post(self, request):
+            return TextResponse("This is post method.")
+
+    res = await client.delete("/")
+    assert res.status_code == 405
+    assert res.headers["allow"] == "GET, POST"
+
+    res = await client.delete("/books")
+    assert res.status_code == 405
+    assert res.headers["allow"] == "GET, POST"
+
+
+@pytest.mark.asyncio
+async def test_routing_class_based_view_pool(app, client):
+    instances = []
+
+    @app.route("/", handler_pool_size=1)
+    class Handler:
+        def __init__(self):
+            instances.append(self)
+
+        async def get(self, request):
+            return TextResponse(str(id(self)))
+
+    first_res = await client.get("/")
+    second_res = await client.get("/")
+
+    assert len(instances) == 1
+    assert first_res.text == second_res.text == str(id(instances[0]))
+
+
+@pytest.mark.asyncio
+async def test_routing_mount_sub_application_priority(app, client):
+    @app.route("/blog/{postid}")
+    async def post(request, postid):
+        return TextResponse(f"post {postid}")
+
+    blogRouter = Router()
+
+    @blogRouter.route("/latest")
+    async def latest(request):
+        return TextResponse("latest post")
+
+    app.mount(prefix="/blog", router=blogRouter)
+
+    res = await client.get("/blog/latest")
+    assert res.text == "latest post"
+
+    res = await client.get("/blog/1")
+    assert res.text == "post 1"
+
+
+@pytest.mark.asyncio
+async def test_routing_static_route_priority(app, client):
+    @app.route("/account/{username}")
+    async def my_account(request, username):
+        return TextResponse(f"account of {username}")
+
+    @app.route("/account/me")
+    async def account(request):
+        return TextResponse("my account")
+
+    blogRouter = Router()
+
+    @blogRouter.route("/health")
+    async def health(request):
+        return TextResponse("ok")
+
+    app.mount(prefix="/blog", router=blogRouter)
+
+    res = await client.get("/account/me")
+    assert res.text == "my account"
+
+    res = await client.get("/account/me/")
+    assert res.text == "my account"
+
+    res = await client.get("/account/john")
+    assert res.text == "account of john"
+
+    res = await client.get("/blog/health")
+    assert res.text == "ok"
+
+
+@pytest.mark.asyncio
+async def test_routing_freeze(app, client):
+    blogRouter = Router()
+
+    @blogRouter.route("/{postid:int}")
+    async def post(request, postid):
+        return TextResponse(f"post {postid}")
+
+    app.mount(prefix="/blog", router=blogRouter)
+    app.freeze()
+
+    assert blogRouter.frozen
+    # mounted router is served from the tree of the app router
+    assert blogRouter._Router__tree is None
+    with pytest.raises(RuntimeError):
+        blogRouter.add_route("/new", post)
+    with pytest.raises(RuntimeError):
+        app.mount(prefix="/other", router=Router())
+
+    res = await client.get("/blog/1")
+    assert res.text == "post 1"
+
+
+@pytest.mark.asyncio
+async def test_routing_host(app, client):
+    @app.route("/")
+    async def main(request):
+        return TextResponse("main")
+
+    apiRouter = Router()
+
+    @apiRouter.route("/")
+    async def api(request):
+        return TextResponse("api")
+
+    tenantRouter = Router()
+
+    @tenantRouter.route("/")
+    async def tenant(request):
+        return TextResponse(f"tenant {request.headers['host']}")
+
+    app.mount_host(apiRouter, "api.example.com")
+    app.mount_host(tenantRouter, "*.tenants.example.com")
+
+    res = await client.get("/")
+    assert res.text == "main"
+
+    res = await client.get("/", headers={"host": "API.example.com:8000"})
+    assert res.text == "api"
+
+    res = await client.get("/", headers={"host": "abc.tenants.example.com"})
+    assert res.text == "tenant abc.tenants.example.com"
+
+    res = await client.get("/", headers={"host": "tenants.example.com"})
+    assert res.text == "main"
+
+    res = await client.get("/", headers={"host": "example.com"})
+    assert res.text == "main"
+
+
+@pytest.mark.asyncio
+async def test_routing_same_path_different_methods(app, client):
+    @app.route("/items", methods=["GET"])
+    async def list_items(request):
+        return TextResponse("list items")
+
+    @app.route("/items", methods=["POST"])
+    async def create_item(request):
+        return TextResponse("create item")
+
+    @app.route("/items/{itemid:int}", methods=["GET"])
+    async def get_item(request, itemid):
+        return TextResponse(f"get item {itemid}")
+
+    @app.route("/items/{name}", methods=["DELETE"])
+    async def delete_item(request, name):
+        return TextResponse(f"delete item {name}")
+
+    res = await client.get("/items")
+    assert res.text == "list items"
+
+    res = await client.post("/items")
+    assert res.text == "create item"
+
+    res = await client.put("/items")
+    assert res.status_code == 405
+    assert res.headers["allow"] == "GET, POST"
+
+    res = await client.get("/items/1")
+    assert res.text == "get item 1"
+
+    # first path match does not accept DELETE, so the next one is used
+    res = await client.delete("/items/1")
+    assert res.text == "delete item 1"
+
+    # methods of every path matching the URL are allowed
+    res = await client.put("/items/1")
+    assert res.status_code == 405
+    assert res.headers["allow"] == "GET, DELETE"
+
+    with pytest.raises(AssertionError):
+        app.add_route("/items", list_items, methods=["POST", "PUT"])
+
+
+@pytest.mark.asyncio
+async def test_routing_same_path_class_based_view(app, client):
+    @app.route("/books")
+    class Books:
+        async def get(self, request):
+            return TextResponse("list books")
+
+    @app.route("/books", methods=["DELETE"])
+    async def delete_books(request):
+        return TextResponse("delete books")
+
+    res = await client.get("/books")
+    assert res.text == "list books"
+
+    res = await client.delete("/books")
+    assert res.text == "delete books"
+
+    res = await client.post("/books")
+    assert res.status_code == 405
+    assert res.headers["allow"] == "GET, DELETE"
+
+
+@pytest.mark.asyncio
+async def test_routing_asgi_route(app, client):
+    class RaiseMiddleware(BaseMiddleware):
+        async def process_request(self, request):
+            raise Exception("ASGI routes skip middlewares")
+
+    app.add_middleware(RaiseMiddleware)
+
+    @app.asgi_route("/raw/{name}", methods=["GET"])
+    async def raw(scope, receive, send):
+        body = f"hello {scope['path_params']['name']}".encode()
+        await send(
+            {"type": "http.response.start", "status": 200, "headers": []}
+        )
+        await send({"type": "http.response.body", "body": body})
+
+    res = await client.get("/raw/yaat")
+    assert res.status_code == 200
+    assert res.text == "hello yaat"
+
+    # other methods go through middlewares to respond with 405
+    with pytest.raises(Exception):
+        await client.post("/raw/yaat")
+
+
+@pytest.mark.asyncio
+async def test_routing_mount_asgi(app, client):
+    async def sub_app(scope, receive, send):
+        body = f"{scope['root_path']} {scope['path']}".encode()
+        await send(
+            {"type": "http.response.start", "status": 200, "headers": []}
+        )
+        await send({"type": "http.response.body", "body": body})
+
+    @app.route("/sub/route")
+    async def handler(request):
+        return TextResponse("route")
+
+    router = Router()
+    router.mount_asgi(sub_app, prefix="/app")
+    app.mount(router, prefix="/sub")
+
+    res = await client.get("/sub/app/hello/world")
+    assert res.text == "/sub/app /hello/world"
+
+    res = await client.get("/sub/app")
+    assert res.text == "/sub/app /"
+
+    # routes still win over mounted app
+    res = await client.get("/sub/route")
+    assert res.text == "route"
+
+    res = await client.get("/other")
+    assert res.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_routing_asgi_route_matched_once(app, client):
+    async def sub_app(scope, receive, send):
+        body = f"{scope['root_path']!r} {scope['path']}".encode()
+        await send(
+            {"type": "http.response.start", "status": 200, "headers": []}
+        )
+        await send({"type": "http.response.body", "body": body})
+
+    @app.route("/route", methods=["GET"])
+    async def handler(request):
+        return TextResponse("route")
+
+    app.add_asgi_route("/raw", sub_app)
+
+    # root path does not change when mounted at root
+    root_app = Yaat()
+    root_app.mount_asgi(sub_app, prefix="/")
+    res = await root_app.test_client().get("/hello")
+    assert res.text == "'' /hello"
+
+    matched = []
+    get_route = app.router.get_route
+
+    def count_get_route(*args, **kwargs):
+        matched.append(kwargs["request_path"])
+        return get_route(*args, **kwargs)
+
+    app.router.get_route = count_get_route
+
+    res = await client.get("/route")
+    assert res.text == "route"
+    assert matched == ["/route"]
+
+    res = await client.post("/route")
+    assert res.status_code == 405
+    assert matched == ["/route", "/route"]
@@ -0,0 +1,58 @@
+import pytest
+
+from yaat import Yaat
+from yaat.responses import JSONResponse
+from yaat.serializers import (
+    JSONCodec,
+    ORJSONCodec,
+    UJSONCodec,
+    get_json_codec,
+    orjson,
+    ujson,
+)
+
+
+CODECS = [JSONCodec]
+if orjson is not None:
+    CODECS.append(ORJSONCodec)
+if ujson is not None:
+    CODECS.append(UJSONCodec)
+
+
+@pytest.mark.parametrize("codec_cls", CODECS)
+def test_serializers_codec(codec_cls):
+    codec = codec_cls()
+    data = {"hello": "世界", "list": [1, 2.5, None, True]}
+
+    raw = codec.dumps(data)
+    assert isinstance(raw, bytes)
+    assert raw == JSONCodec().dumps(data)
+
+    assert codec.loads(raw) == data
+    assert codec.loads(bytearray(raw)) == data
+    assert codec.loads(memoryview(raw)) == data
+    assert codec.loads(raw.decode("utf-8")) == data
+
+
+class UpperCodec(JSONCodec):
+    def dumps(self, data):
+        return super().dumps(data).upper()
+
+
+@pytest.mark.asyncio
+async def test_serializers_app_codec():
+    app = Yaat(json_codec=UpperCodec())
+    client = app.test_client()
+
+    @app.route("/", methods=["POST"])
+    async def handler(request):
+        assert get_json_codec() is app.json_codec
+        data = await request.json()
+        return JSONResponse(data)
+
+    res = await client.post("/", json={"hello": "world"})
+    assert res.content == b'{"HELLO":"WORLD"}'
+
+    # codec of an application is not used by other applications
+    other = Yaat()
+    assert other.json_codec is not app.json_codec
@@ -217,3 +217,26 @@ async def test_staticfiles_static_from_sub_router(app, client, tmpdir):
 
     res = await client.get(f"/static/{imagename}")
     assert res.content == CONTENT
+
+
+@pytest.mark.asyncio
+async def test_staticfiles_nested_sub_router(app, client, tmpdir):
+    router = Router()
+    CONTENT = b"xxxx"
+
+    temp = tempfile.NamedTemporaryFile(dir=tmpdir, suffix=".png", delete=False)
+    temp.write(CONTENT)
+    temp.close()
+
+    directory = f"/{str(tmpdir)}"
+    imagename = temp.name.split("/")[-1]
+
+    statics = StaticFiles(directory=directory)
+    router.mount(statics, "/assets")
+    app.mount(router, "/public")
+
+    res = await client.get(f"/public/assets/{imagename}")
+    assert res.content == CONTENT
+
+    res = await client.get(f"/assets/{imagename}")
+    assert res.status_code == 404
@@ -8,11 +8,16 @@ from yaat.middleware import (
     ExceptionMiddleware,
     LifespanMiddleware,
 )
-from yaat.parsers import UrlParamParser
-from yaat.requests import Request
+from yaat.requests import HTTPConnection, Request
 from yaat.responses import Response
-from yaat.routing import Router, RouteTypes
-from yaat.typing import Scope, Receive, Send
+from yaat.routing import (
+    ASGI_ROUTE_TYPES,
+    WEBSOCKET_METHOD,
+    Router,
+    RouteTypes,
+)
+from yaat.serializers import JSONCodec, default_codec, set_json_codec
+from yaat.typing import ASGIApp, Scope, Receive, Send
 from yaat.websockets import WebSocket
 
 
@@ -22,11 +27,26 @@ class Yaat:
         middlewares: typing.Sequence[BaseMiddleware] = None,
         on_startup: typing.Sequence[typing.Callable] = None,
         on_shutdown: typing.Sequence[typing.Callable] = None,
+        max_body_size: int = None,
+        cancel_on_disconnect: bool = False,
+        json_codec: JSONCodec = None,
     ):
         self.router = Router()
+        # limit of request body in bytes, unless route or router has its own
+        self.max_body_size = max_body_size
+        # cancel handlers when client disconnects, unless route has its own
+        self.cancel_on_disconnect = cancel_on_disconnect
+        # used by requests, responses and websockets to encode and decode JSON
+        self.json_codec = json_codec if json_codec else default_codec
+        self.hosts = {}  # host -> Router
+        self.wildcard_hosts = {}  # parent domain of "*.domain" -> Router
         self.middleware = LifespanMiddleware(
             app=self, on_startup=on_startup, on_shutdown=on_shutdown
         )
+        # ASGI middlewares wrap around dispatch and BaseMiddleware(s)
+        self.asgi_middleware = self.dispatch
+        self.__frozen = False
+        self.__freeze_hooks = []  # called with the application on freeze
 
         # NOTE: setup middleware(s) registration
         self.__setup_middlewares(middlewares)
@@ -38,6 +58,11 @@ class Yaat:
         methods: typing.List[str] = None,
         has_schema: bool = False,
         tags: typing.List[str] = None,
+        invalid_param_status: int = None,
+        handler_pool_size: int = None,
+        middlewares: typing.Sequence[typing.Callable] = None,
+        max_body_size: int = None,
+        cancel_on_disconnect: bool = None,
     ) -> typing.Callable:
         def wrapper(handler):
             self.add_route(
@@ -46,6 +71,11 @@ class Yaat:
                 methods=methods,
                 has_schema=has_schema,
                 tags=tags,
+                invalid_param_status=invalid_param_status,
+                handler_pool_size=handler_pool_size,
+                middlewares=middlewares,
+                max_body_size=max_body_size,
+                cancel_on_disconnect=cancel_on_disconnect,
             )
             return handler
 
@@ -58,6 +88,11 @@ class Yaat:
         methods: typing.List[str] = None,
         has_schema: bool = False,
         tags: typing.List[str] = None,
+        invalid_param_status: int = None,
+        handler_pool_size: int = None,
+        middlewares: typing.Sequence[typing.Callable] = None,
+        max_body_size: int = None,
+        cancel_on_disconnect: bool = None,
     ):
         self.router.add_route(
             path=path,
@@ -65,13 +100,21 @@ class Yaat:
             methods=methods,
             has_schema=has_schema,
             tags=tags,
+            invalid_param_status=invalid_param_status,
+            handler_pool_size=handler_pool_size,
+            middlewares=middlewares,
+            max_body_size=max_body_size,
+            cancel_on_disconnect=cancel_on_disconnect,
         )
 
     def websocket_route(
-        self, path: str, tags: typing.List[str] = None
+        self,
+        path: str,
+        tags: typing.List[str] = None,
+        middlewares: typing.Sequence[typing.Callable] = None,
     ) -> typing.Callable:
         def wrapper(handler):
-            self.add_websocket_route(path, handler, tags)
+            self.add_websocket_route(path, handler, tags, middlewares)
             return handler
 
         return wrapper
@@ -81,38 +124,123 @@ class Yaat:
         path: str,
         handler: typing.Callable,
         tags: typing.List[str] = None,
+        middlewares: typing.Sequence[typing.Callable] = None,
+    ):
+        self.router.add_websocket_route(
+            path=path, handler=handler, tags=tags, middlewares=middlewares
+        )
+
+    def asgi_route(
+        self, path: str, methods: typing.List[str] = None
+    ) -> typing.Callable:
+        def wrapper(app):
+            self.add_asgi_route(path, app, methods)
+            return app
+
+        return wrapper
+
+    def add_asgi_route(
+        self, path: str, app: ASGIApp, methods: typing.List[str] = None
     ):
-        self.router.add_websocket_route(path=path, handler=handler, tags=tags)
+        self.router.add_asgi_route(path=path, app=app, methods=methods)
 
     def mount(self, router: Router, prefix: str):
         self.router.mount(router=router, prefix=prefix)
 
+    def mount_asgi(self, app: ASGIApp, prefix: str):
+        self.router.mount_asgi(app=app, prefix=prefix)
+
+    # NOTE: Host Routing
+    def mount_host(self, router: Router, host: str):
+        """
+        Serve requests for the host with the router instead of the default one.
+        Use "*.example.com" to match any subdomain of example.com.
+        """
+        if self.__frozen:
+            raise RuntimeError("Cannot add hosts after application is frozen.")
+
+        host = host.lower()
+        if host.startswith("*."):
+            hosts = self.wildcard_hosts
+            host = host[2:]
+        else:
+            hosts = self.hosts
+
+        assert host not in hosts, f"Host {host}, already exists"
+        hosts[host] = router
+
+    def get_router(self, connection: HTTPConnection) -> Router:
+        # do not read headers when there is no host routing
+        if not self.hosts and not self.wildcard_hosts:
+            return self.router
+
+        host = connection.headers.host
+        if not host:
+            return self.router
+
+        # remove port, and keep IPv6 address such as "[::1]:8000" intact
+        host = host.lower()
+        if ":" in host and not host.endswith("]"):
+            host = host.rsplit(":", 1)[0]
+
+        router = self.hosts.get(host)
+        if router is not None:
+            return router
+
+        # look up parent domains for wildcard subdomains
+        while "." in host:
+            host = host.split(".", 1)[1]
+            router = self.wildcard_hosts.get(host)
+            if router is not None:
+                return router
+
+        return self.router
+
+    # NOTE: Route Matching
+    def match_route(
+        self, connection: HTTPConnection, method: str
+    ) -> typing.Tuple[typing.Any, typing.Dict[str, typing.Any]]:
+        """
+        Route and path params of the connection. Route matched by
+        handle_asgi is reused unless middlewares changed the path.
+        """
+        match = connection.scope.pop("yaat.route", None)
+        if match is not None:
+            path, match_method, route, kwargs, error = match
+            if path == connection.path and match_method == method:
+                if error is not None:
+                    raise error
+                return route, kwargs
+
+        router = self.get_router(connection)
+        return router.get_route(request_path=connection.path, method=method)
+
     # NOTE: Handle HTTP Request
     async def handle_request(self, request: Request) -> Response:
-        route, kwargs = self.router.get_route(request_path=request.path)
-
         try:
+            route, kwargs = self.match_route(request, request.method)
             # check if route exists and it is not websocket route
             if (
                 route
                 and route.handler is not None
                 and route.type != RouteTypes.WEBSOCKET
             ):
-                handler = route.handler
-
-                if inspect.isclass(handler):
-                    handler = getattr(handler(), request.method.lower(), None)
-                    if handler is None:
-                        raise HTTPException(405)
-                if not route.is_valid_method(request.method):
-                    raise HTTPException(405)
-
-                # convert url param datatypes to annotation types
-                param_parser = UrlParamParser(
-                    handler, kwargs, inspect.isclass(route.handler)
-                )
-                kwargs = param_parser.get()
-                response = await handler(request, **kwargs)
+                max_body_size = route.max_body_size
+                if max_body_size is None:
+                    max_body_size = self.max_body_size
+                if max_body_size is not None:
+                    request.limit_body_size(max_body_size)
+
+                cancel_on_disconnect = route.cancel_on_disconnect
+                if cancel_on_disconnect is None:
+                    cancel_on_disconnect = self.cancel_on_disconnect
+
+                if cancel_on_disconnect:
+                    response = await request.run_until_disconnect(
+                        route.handle(request, kwargs)
+                    )
+                else:
+                    response = await route.handle(request, kwargs)
             else:
                 raise HTTPException(404)
         except Exception as e:
@@ -124,15 +252,66 @@ class Yaat:
 
     # NOTE: Handle Websocket
     async def handle_websocket(self, websocket: WebSocket):
-        route, _ = self.router.get_route(request_path=websocket.path)
+        route, _ = self.match_route(websocket, WEBSOCKET_METHOD)
 
         if route and route.handler is not None:
-            handler = route.handler
-            await handler(websocket)
+            await route.handle_websocket(websocket)
+
+    # NOTE: Handle ASGI Routes
+    async def handle_asgi(
+        self, scope: Scope, receive: Receive, send: Send
+    ) -> bool:
+        """
+        Dispatch to ASGI app routes before Request is built and
+        middlewares are run. Return False if other routes handle it.
+        """
+        if self.hosts or self.wildcard_hosts:
+            router = self.get_router(HTTPConnection(scope))
+        else:
+            router = self.router
+        if not router.tree.has_asgi_routes:
+            return False
+
+        if scope["type"] == "websocket":
+            method = WEBSOCKET_METHOD
+        else:
+            method = scope["method"]
+
+        path = scope["path"]
+        try:
+            route, kwargs = router.get_route(request_path=path, method=method)
+        except HTTPException as e:
+            # let middlewares respond with 405
+            scope["yaat.route"] = (path, method, None, None, e)
+            return False
+
+        if route is None or route.type not in ASGI_ROUTE_TYPES:
+            # matched route is reused after middlewares
+            scope["yaat.route"] = (path, method, route, kwargs, None)
+            return False
+
+        await route.handle_asgi(scope, receive, send, kwargs)
+        return True
 
     # NOTE: Middleware
-    def add_middleware(self, middleware_cls: BaseMiddleware, *args, **kwargs):
-        self.middleware.add(middleware_cls, *args, **kwargs)
+    def add_middleware(self, middleware_cls: typing.Type, *args, **kwargs):
+        """
+        Register BaseMiddleware, or any ASGI middleware such as ASGIMiddleware.
+        ASGI middlewares always wrap around BaseMiddleware(s).
+        """
+        if self.__frozen:
+            raise RuntimeError(
+                "Cannot add middleware after application is frozen."
+            )
+
+        if inspect.isclass(middleware_cls) and issubclass(
+            middleware_cls, BaseMiddleware
+        ):
+            self.middleware.add(middleware_cls, *args, **kwargs)
+        else:
+            self.asgi_middleware = middleware_cls(
+                self.asgi_middleware, *args, **kwargs
+            )
 
     def __setup_middlewares(
         self, middlewares: typing.Sequence[BaseMiddleware] = None
@@ -146,6 +325,41 @@ class Yaat:
         for middleware in middlewares:
             self.add_middleware(middleware)
 
+    # NOTE: Freeze
+    @property
+    def frozen(self) -> bool:
+        return self.__frozen
+
+    def freeze(self):
+        """
+        Compile routing and middlewares so the first request is served as fast
+        as the others, and invalid routes fail on startup instead of under load.
+        Routes, mounts and middleware can no longer be added after.
+        It is called automatically on lifespan startup.
+        """
+        if self.__frozen:
+            return
+
+        self.router.freeze()
+        self.middleware.compile()
+        for router in self.hosts.values():
+            router.freeze()
+        for router in self.wildcard_hosts.values():
+            router.freeze()
+        for hook in self.__freeze_hooks:
+            hook(self)
+        self.__frozen = True
+
+    def add_freeze_hook(self, hook: typing.Callable):
+        """
+        Run hook with the application once routes are frozen, to compile
+        what depends on the routes such as OpenAPI schema on startup.
+        """
+        if self.__frozen:
+            hook(self)
+        else:
+            self.__freeze_hooks.append(hook)
+
     # NOTE: Test Client
     def test_client(
         self, base_url: str = "http://testserver"
@@ -155,6 +369,16 @@ class Yaat:
 
         return self._test_client
 
+    async def dispatch(self, scope: Scope, receive: Receive, send: Send):
+        """
+        Innermost ASGI app of ASGI middlewares.
+        """
+        if scope["type"] != "lifespan":
+            if await self.handle_asgi(scope, receive, send):
+                return
+        await self.middleware(scope, receive, send)
+
     async def __call__(self, scope: Scope, receive: Receive, send: Send):
         scope["app"] = self
-        await self.middleware(scope, receive, send)
+        set_json_codec(self.json_codec)
+        await self.asgi_middleware(scope, receive, send)
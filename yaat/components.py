@@ -1,106 +1,166 @@
-from urllib.parse import parse_qsl, urlparse
+from urllib.parse import parse_qsl, quote_plus, urlparse
 import tempfile
 import typing
 
 from yaat.constants import ENCODING_METHOD
 from yaat.concurrency import run_in_threadpool
+from yaat.memory import body_memory
 from yaat.typing import Scope
 
 
-class DictMapper(dict):
-    def __cmp__(self, dict_: typing.Dict):
-        return self.__cmp__(self.__dict__, dict_)
+# cached value which can be None is not loaded yet
+NOT_LOADED = object()
 
-    def __contains__(self, item: typing.Any) -> bool:
-        return item in self.__dict__
 
-    def __delitem__(self, key: str):
-        del self.__dict__[key]
+class MultiDict(typing.Mapping[str, typing.Any]):
+    """
+    Read-only dictionary keeping every value of repeated keys in order.
+    Looking up a key returns its first value, `getlist` returns all of them.
+    """
 
-    def __getitem__(self, key: str):
-        return self.__dict__[key]
-
-    def __iter__(self):
-        return iter(self.__dict__)
-
-    def __len__(self):
-        return len(self.__dict__)
+    def __init__(
+        self, items: typing.Iterable[typing.Tuple[str, typing.Any]] = None
+    ):
+        self._items = list(items) if items else []
+        self._index = self._build_index(self._items)
+
+    @staticmethod
+    def _build_index(
+        items: typing.List[typing.Tuple[str, typing.Any]]
+    ) -> typing.Dict[str, typing.List[typing.Any]]:
+        index = {}  # key -> values
+        for key, value in items:
+            if key in index:
+                index[key].append(value)
+            else:
+                index[key] = [value]
+        return index
 
-    def __repr__(self):
-        return repr(self.__dict__)
+    def __getitem__(self, key: str) -> typing.Any:
+        return self._index[key][0]
 
-    def __setitem__(self, key: str, item: typing.Any):
-        self.__dict__[key] = item
+    def __contains__(self, key: typing.Any) -> bool:
+        return key in self._index
 
-    def clear(self):
-        return self.__dict__.clear()
+    def __iter__(self) -> typing.Iterator[str]:
+        return iter(self._index)
 
-    def copy(self):
-        return self.__dict__.copy()
+    def __len__(self) -> int:
+        return len(self._index)
 
-    def get(self, key: str, default: typing.Any = None):
-        return self.__dict__.get(key, default)
+    def __eq__(self, other: typing.Any) -> bool:
+        if isinstance(other, MultiDict):
+            return self._items == other._items
+        return super().__eq__(other)
 
-    def has_key(self, k: str):
-        return k in self.__dict__
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self._items!r})"
 
-    def items(self):
-        return self.__dict__.items()
+    def get(self, key: str, default: typing.Any = None) -> typing.Any:
+        values = self._index.get(key)
+        return values[0] if values else default
 
-    def keys(self):
-        return self.__dict__.keys()
+    def getlist(self, key: str) -> typing.List[typing.Any]:
+        return list(self._index.get(key, ()))
 
-    def pop(self, *args):
-        return self.__dict__.pop(*args)
+    def items(
+        self, multi: bool = False
+    ) -> typing.Iterable[typing.Tuple[str, typing.Any]]:
+        if multi:
+            return list(self._items)
+        return super().items()
 
-    def update(self, *args, **kwargs):
-        return self.__dict__.update(*args, **kwargs)
 
-    def values(self):
-        return self.__dict__.values()
+class URL:
+    """
+    URL of the request is built from scope components when first read,
+    Host header is read from the request headers.
+    """
+
+    __slots__ = (
+        "scope",
+        "headers",
+        "_scheme",
+        "_server",
+        "_path",
+        "_query",
+        "_host_header",
+        "_fragment",
+        "_host",
+        "_port",
+        "_url",
+    )
 
+    def __init__(
+        self, url: str = "", scope: Scope = None, headers: "Headers" = None
+    ):
+        self.scope = scope
+        self.headers = headers
+        self._host = NOT_LOADED
+        self._port = NOT_LOADED
+        self._url = NOT_LOADED
 
-class URL:
-    def __init__(self, url: str = "", scope: Scope = None):
         if scope is not None:
             assert not url, 'Cannot set both "url" and "scope".'
 
-            self.scheme = scope.get("scheme", "http")
-            self.server = scope.get("server", None)
-            self.path = scope.get("root_path", "") + scope["path"]
-            self.query = scope.get("query_string", b"")
-            self.host_header = scope["headers"]
+            self._scheme = NOT_LOADED
+            self._server = NOT_LOADED
+            self._path = NOT_LOADED
+            self._query = NOT_LOADED
+            self._host_header = NOT_LOADED
+            self._fragment = ""
         else:
             assert not scope, 'Cannot set both "url" and "scope".'
 
             components = urlparse(url)
             netloc = components.netloc.split(":")
 
-            self.scheme = components.scheme
-            self.server = (netloc[0], netloc[1] if len(netloc) > 1 else None)
-            self.path = components.path
-            self.query = components.query
-            self.host_header = []
-            self.fragment = components.fragment
-
-        # init url
-        self.__init_url()
+            self._scheme = components.scheme
+            self._server = (netloc[0], netloc[1] if len(netloc) > 1 else None)
+            self._path = components.path
+            self._query = components.query
+            self._host_header = None
+            self._fragment = components.fragment
 
     @property
     def scheme(self) -> str:
-        return self.__scheme
-
-    @scheme.setter
-    def scheme(self, scheme: str):
-        self.__scheme = scheme
+        if self._scheme is NOT_LOADED:
+            self._scheme = self.scope.get("scheme", "http")
+        return self._scheme
 
     @property
     def server(self) -> typing.Tuple[str, int]:
-        return self.__server
+        if self._server is NOT_LOADED:
+            self._server = self.scope.get("server", None)  # ip and port
+        return self._server
 
-    @server.setter
-    def server(self, server: typing.Tuple[str, int]):
-        self.__server = server  # ip and port
+    @property
+    def path(self) -> str:
+        if self._path is NOT_LOADED:
+            self._path = self.scope.get("root_path", "") + self.scope["path"]
+        return self._path
+
+    @property
+    def query(self) -> str:
+        if self._query is NOT_LOADED:
+            query = self.scope.get("query_string", b"")
+            try:
+                self._query = query.decode(ENCODING_METHOD)
+            except (AttributeError, UnicodeDecodeError):
+                self._query = query
+        return self._query
+
+    @property
+    def host_header(self) -> str:
+        if self._host_header is NOT_LOADED:
+            if self.headers is None:
+                self.headers = Headers(self.scope["headers"])
+            self._host_header = self.headers.host
+        return self._host_header
+
+    @property
+    def fragment(self) -> str:
+        return self._fragment
 
     @property
     def netloc(self) -> str:
@@ -111,8 +171,8 @@ class URL:
 
     @property
     def host(self) -> str:
-        if not hasattr(self, "_host"):
-            self.__host = None
+        if self._host is NOT_LOADED:
+            self._host = None
 
             if self.server:
                 host, port = self.server
@@ -121,7 +181,7 @@ class URL:
 
     @property
     def port(self) -> int:
-        if not hasattr(self, "_port"):
+        if self._port is NOT_LOADED:
             self._port = None
 
             if self.server:
@@ -129,43 +189,13 @@ class URL:
                 self._port = int(port) if port else None
         return self._port
 
-    @property
-    def query(self) -> str:
-        return self.__query
-
-    @query.setter
-    def query(self, query: bytes):
-        try:
-            self.__query = query.decode(ENCODING_METHOD)
-        except (AttributeError, UnicodeDecodeError):
-            self.__query = query
-
-    @property
-    def host_header(self) -> str:
-        return self.__host_header
-
-    @host_header.setter
-    def host_header(self, headers: typing.Dict[str, str]):
-        host_header = None
-        for key, value in headers:
-            if key == b"host":
-                host_header = value.decode(ENCODING_METHOD)
-                break
-        self.__host_header = host_header
-
-    @property
-    def fragment(self) -> str:
-        return self.__fragment
-
-    @fragment.setter
-    def fragment(self, fragment: str):
-        self.__fragment = fragment
-
     @property
     def url(self) -> str:
-        return self.__url
+        if self._url is NOT_LOADED:
+            self._url = self._build_url()
+        return self._url
 
-    def __init_url(self):
+    def _build_url(self) -> str:
         if self.host_header is not None:
             url = f"{self.scheme}://{self.host_header}{self.path}"
         elif self.server is None:
@@ -183,7 +213,7 @@ class URL:
         if self.query:
             url += "?" + self.query
 
-        self.__url = url
+        return url
 
     def is_secure(self) -> bool:
         return self.scheme in ("https", "wss")
@@ -192,29 +222,15 @@ class URL:
         return str(self) == str(other)
 
     def __str__(self) -> str:
-        return self.__url
+        return self.url
 
 
 class Address:
-    def __init__(self, host: str, port: int):
-        self.host = host
-        self.port = port
-
-    @property
-    def host(self) -> str:
-        return self.__host
-
-    @host.setter
-    def host(self, host: str):
-        self.__host = str(host)
-
-    @property
-    def port(self) -> int:
-        return self.__port
+    __slots__ = ("host", "port")
 
-    @port.setter
-    def port(self, port: int):
-        self.__port = int(port) if port else None
+    def __init__(self, host: str, port: int):
+        self.host = str(host)
+        self.port = int(port) if port else None
 
     def __str__(self) -> str:
         if self.host and self.port:
@@ -222,87 +238,142 @@ class Address:
         return self.host
 
 
-class Headers(DictMapper):
+# lowercase raw names of header names looked up by the application,
+# bounded as names can also come from requests
+HEADER_NAMES = {}
+HEADER_NAMES_MAX_SIZE = 1024
+
+
+def header_name(key: str) -> bytes:
+    name = HEADER_NAMES.get(key)
+    if name is None:
+        name = key.lower().encode(ENCODING_METHOD)
+        if len(HEADER_NAMES) < HEADER_NAMES_MAX_SIZE:
+            HEADER_NAMES[key] = name
+    return name
+
+
+class Headers(typing.Mapping[str, str]):
+    """
+    Read-only view of raw ASGI headers, which are not copied.
+    Names are case-insensitive and values are only decoded when looked up.
+    Header sent multiple times returns the first value, use `getlist`
+    for all of them.
+    """
+
     def __init__(self, raw_headers: typing.List[typing.Tuple[bytes, bytes]]):
-        self.__dict__ = {
-            key.decode(ENCODING_METHOD): value.decode(ENCODING_METHOD)
-            for key, value in raw_headers
-        }
+        # ASGI servers send header names in lowercase
+        self.raw = raw_headers
+        self._host = NOT_LOADED
+
+    @property
+    def host(self) -> str:
+        """
+        Host header, shared by URL and host routing.
+        """
+        if self._host is NOT_LOADED:
+            self._host = self.get("host")
+        return self._host
 
+    def __getitem__(self, key: str) -> str:
+        name = header_name(key)
+        for raw_key, raw_value in self.raw:
+            if raw_key == name:
+                return raw_value.decode(ENCODING_METHOD)
+        raise KeyError(key)
+
+    def __contains__(self, key: typing.Any) -> bool:
+        if not isinstance(key, str):
+            return False
+        name = header_name(key)
+        for raw_key, _ in self.raw:
+            if raw_key == name:
+                return True
+        return False
+
+    def __iter__(self) -> typing.Iterator[str]:
+        seen = set()
+        for raw_key, _ in self.raw:
+            if raw_key not in seen:
+                seen.add(raw_key)
+                yield raw_key.decode(ENCODING_METHOD)
+
+    def __len__(self) -> int:
+        return len({raw_key for raw_key, _ in self.raw})
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
+
+    def get(self, key: str, default: typing.Any = None) -> typing.Any:
+        name = header_name(key)
+        for raw_key, raw_value in self.raw:
+            if raw_key == name:
+                return raw_value.decode(ENCODING_METHOD)
+        return default
+
+    def getlist(self, key: str) -> typing.List[str]:
+        name = header_name(key)
+        return [
+            raw_value.decode(ENCODING_METHOD)
+            for raw_key, raw_value in self.raw
+            if raw_key == name
+        ]
+
+
+class QueryParams(MultiDict):
+    """
+    Query string parameters, parsed from the raw query string on first access.
+    """
 
-class QueryParams(DictMapper):
-    def __init__(self, raw_query: bytes):
+    def __init__(
+        self,
+        raw_query: typing.Union[
+            bytes, str, typing.Iterable[typing.Tuple[str, str]]
+        ] = b"",
+    ):
+        if isinstance(raw_query, (bytes, str)):
+            self.raw = raw_query
+            self.__items = None
+            self.__index = None
+        else:
+            self.raw = None
+            self.__items = list(raw_query)
+            self.__index = self._build_index(self.__items)
+
+    def __parse(self):
         try:
-            query_str = raw_query.decode(ENCODING_METHOD)
+            query_str = self.raw.decode(ENCODING_METHOD)
         except (AttributeError, UnicodeDecodeError):
-            query_str = raw_query
-        # parse the query string
-        query_list = parse_qsl(query_str, keep_blank_values=True)
-
-        for qs in query_list:
-            key = qs[0]
-            value = qs[1]
-
-            if key not in self.__dict__:
-                self.__dict__[key] = value
-                continue
-
-            # if key exists, store multiple values in list
-            values = self.__dict__[key]
-            # convert to list if not a list already
-            if type(values) != list:
-                values = [values]
-            values.append(value)
-            self.__dict__[key] = values
-
-    def __str__(self) -> str:
-        query_string = None
-
-        for key, value in self.items():
-            # if no value, just add back key
-            if not value:
-                query_string = (
-                    f"{key}" if not query_string else f"{query_string}&{key}"
-                )
-            # if list, iterate and add back
-            elif type(value) == list:
-                for each in value:
-                    query_string = (
-                        f"{key}={each}"
-                        if not query_string
-                        else f"{query_string}&{key}={each}"
-                    )
-            # just add
-            else:
-                query_string = (
-                    f"{key}={value}"
-                    if not query_string
-                    else f"{query_string}&{key}={value}"
-                )
-
-        return query_string
+            query_str = self.raw
+        self.__items = parse_qsl(query_str, keep_blank_values=True)
+        self.__index = self._build_index(self.__items)
 
+    @property
+    def _items(self) -> typing.List[typing.Tuple[str, str]]:
+        if self.__items is None:
+            self.__parse()
+        return self.__items
 
-class Form(DictMapper):
-    def __init__(self, form_data: typing.List[typing.Tuple[str, str]] = None):
-        if not form_data:
-            form_data = []
+    @property
+    def _index(self) -> typing.Dict[str, typing.List[str]]:
+        if self.__index is None:
+            self.__parse()
+        return self.__index
 
-        for item in form_data:
-            key = item[0]
-            value = item[1]
+    def __str__(self) -> str:
+        # URL encode every pair, key without value is added back as it is
+        return "&".join(
+            f"{quote_plus(key)}={quote_plus(value)}"
+            if value
+            else quote_plus(key)
+            for key, value in self._items
+        )
 
-            if key not in self.__dict__:
-                self.__dict__[key] = value
-                continue
 
-            # if key exists, store multiple values in list
-            values = self.__dict__[key]
-            # convert to list if not a list already
-            if type(values) != list:
-                values = [values]
-            values.append(value)
-            self.__dict__[key] = values
+class Form(MultiDict):
+    """
+    Form data, values of uploaded files are UploadFile.
+    """
 
 
 class UploadFile:
@@ -313,18 +384,47 @@ class UploadFile:
     ):
         self.name = name
         self.content_type = content_type
+        # bytes of the spooled file held in memory, counted in body memory
+        self.memory = 0
+        self.spooled = file is None
         if file is None:
             file = tempfile.SpooledTemporaryFile(max_size=self.SPOOL_MAX_SIZE)
         self.file = file
 
     async def write(self, data: typing.Union[bytes, str]):
+        if self.spooled and body_memory.exhausted:
+            # write to disk early instead of using more memory
+            await self.rollover()
+        elif self.spooled:
+            self.memory += len(data)
+            body_memory.acquire(len(data))
+
         await run_in_threadpool(self.file.write, data)
 
+        if self.spooled and self.memory > self.SPOOL_MAX_SIZE:
+            # spooled file has been written to disk
+            self.spooled = False
+            self.release_memory()
+
     async def read(self, size: int = None) -> typing.Union[bytes, str]:
         return await run_in_threadpool(self.file.read, size)
 
     async def seek(self, offset: int):
         await run_in_threadpool(self.file.seek, offset)
 
+    async def rollover(self):
+        """
+        Move spooled file from memory to disk.
+        """
+        if self.spooled:
+            await run_in_threadpool(self.file.rollover)
+            self.spooled = False
+            self.release_memory()
+
+    def release_memory(self):
+        body_memory.release(self.memory)
+        self.memory = 0
+
     async def close(self):
+        self.release_memory()
         await run_in_threadpool(self.file.close)
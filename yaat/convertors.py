@@ -0,0 +1,61 @@
+import typing
+import uuid
+
+
+class Convertor:
+    """
+    Path parameter convertor used in route syntax, "{name:type}".
+    `regex` decides whether the path segment matches the route and
+    `convert` turns the matched string into the value handler receives.
+    """
+
+    regex = ""
+
+    def convert(self, value: str) -> typing.Any:
+        raise NotImplementedError()
+
+
+class StringConvertor(Convertor):
+    regex = "[^/]+"
+
+    def convert(self, value: str) -> str:
+        return value
+
+
+class PathConvertor(Convertor):
+    # can only be used as the last segment of the route,
+    # it captures the remaining path including "/"
+    regex = ".*"
+
+    def convert(self, value: str) -> str:
+        return value
+
+
+class IntegerConvertor(Convertor):
+    regex = "-?[0-9]+"
+
+    def convert(self, value: str) -> int:
+        return int(value)
+
+
+class FloatConvertor(Convertor):
+    regex = r"-?[0-9]+(?:\.[0-9]+)?"
+
+    def convert(self, value: str) -> float:
+        return float(value)
+
+
+class UUIDConvertor(Convertor):
+    regex = "[0-9a-fA-F]{8}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{12}"
+
+    def convert(self, value: str) -> uuid.UUID:
+        return uuid.UUID(value)
+
+
+CONVERTORS = {
+    "str": StringConvertor(),
+    "path": PathConvertor(),
+    "int": IntegerConvertor(),
+    "float": FloatConvertor(),
+    "uuid": UUIDConvertor(),
+}
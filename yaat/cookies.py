@@ -0,0 +1,162 @@
+from email.utils import formatdate
+from http.cookies import CookieError
+import re
+import string
+import time
+import typing
+
+
+# characters allowed in cookie values without quoting
+COOKIE_LEGAL_CHARS = frozenset(
+    string.ascii_letters + string.digits + "!#$%&'*+-.^_`|~:"
+)
+# escapes of quoted cookie values, same as http.cookies
+COOKIE_ESCAPES = {
+    char: f"\\{char:03o}"
+    for char in range(256)
+    if chr(char) not in COOKIE_LEGAL_CHARS and chr(char) not in " ()/<=>?@[]{}"
+}
+COOKIE_ESCAPES.update({ord('"'): '\\"', ord("\\"): "\\\\"})
+COOKIE_ESCAPE_REGEX = re.compile(r"\\(?:([0-3][0-7][0-7])|(.))")
+
+COOKIE_SAMESITE = ("strict", "lax", "none")
+# characters which would end the attribute or the header
+COOKIE_ATTRIBUTE_ILLEGAL_REGEX = re.compile(r"[;\r\n]")
+
+
+def quote_cookie_value(value: str) -> str:
+    if all(char in COOKIE_LEGAL_CHARS for char in value):
+        return value
+    return '"' + value.translate(COOKIE_ESCAPES) + '"'
+
+
+def unquote_cookie_value(value: str) -> str:
+    if len(value) < 2 or value[0] != '"' or value[-1] != '"':
+        return value
+
+    value = value[1:-1]
+    if "\\" not in value:
+        return value
+    return COOKIE_ESCAPE_REGEX.sub(
+        lambda match: chr(int(match.group(1), 8))
+        if match.group(1)
+        else match.group(2),
+        value,
+    )
+
+
+def parse_cookies(raw: str) -> typing.Iterator[typing.Tuple[str, str]]:
+    """
+    Parse Cookie header in a single pass, name and value pairs are
+    yielded as they are found so looking up one cookie can stop early.
+    Unlike http.cookies, malformed pairs are kept instead of dropped.
+    """
+    start = 0
+    length = len(raw)
+    while start < length:
+        end = raw.find(";", start)
+        if end == -1:
+            end = length
+
+        name, separator, value = raw[start:end].partition("=")
+        start = end + 1
+        if not separator:
+            # value without name, as browsers do
+            name, value = "", name
+
+        name = name.strip()
+        value = value.strip()
+        if name or value:
+            yield name, unquote_cookie_value(value)
+
+
+class Cookies(typing.Mapping[str, str]):
+    """
+    Read-only cookies of the request. Cookie header is only parsed
+    until the requested cookie is found, the first value is kept
+    if a cookie is sent multiple times.
+    """
+
+    def __init__(self, raw: str = None):
+        self.raw = raw or ""
+        self._cookies = {}  # name -> value, parsed so far
+        self._pairs = parse_cookies(self.raw)
+
+    def _parse_until(self, name: str = None):
+        for key, value in self._pairs:
+            if key not in self._cookies:
+                self._cookies[key] = value
+            if key == name:
+                return
+
+    def __getitem__(self, name: str) -> str:
+        if name not in self._cookies:
+            self._parse_until(name)
+        return self._cookies[name]
+
+    def __contains__(self, name: typing.Any) -> bool:
+        if name not in self._cookies:
+            self._parse_until(name)
+        return name in self._cookies
+
+    def __iter__(self) -> typing.Iterator[str]:
+        self._parse_until()
+        return iter(self._cookies)
+
+    def __len__(self) -> int:
+        self._parse_until()
+        return len(self._cookies)
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
+
+
+def check_cookie_attribute(name: str, value: str) -> str:
+    value = str(value)
+    if COOKIE_ATTRIBUTE_ILLEGAL_REGEX.search(value):
+        raise CookieError(f"Illegal {name} {value!r}")
+    return value
+
+
+def serialize_cookie(
+    key: str,
+    value: str = "",
+    max_age: int = None,
+    expires: typing.Union[int, str] = None,
+    path: str = "/",
+    domain: str = None,
+    secure: bool = False,
+    httponly: bool = False,
+    samesite: str = "lax",
+) -> str:
+    """
+    Value of Set-Cookie header, in the same format as http.cookies.
+    Raise CookieError for names and attributes which are not allowed.
+    """
+    if not key or not all(char in COOKIE_LEGAL_CHARS for char in key):
+        raise CookieError(f"Illegal key {key!r}")
+    cookie = [f"{key}={quote_cookie_value(str(value))}"]
+
+    if expires is not None:
+        if isinstance(expires, int):
+            # seconds from now
+            expires = formatdate(time.time() + expires, usegmt=True)
+        cookie.append(f"expires={check_cookie_attribute('expires', expires)}")
+    if path is not None:
+        cookie.append(f"Path={check_cookie_attribute('path', path)}")
+    if domain is not None:
+        cookie.append(f"Domain={check_cookie_attribute('domain', domain)}")
+    if max_age is not None:
+        cookie.append(f"Max-Age={int(max_age)}")
+    if secure:
+        cookie.append("Secure")
+    if httponly:
+        cookie.append("HttpOnly")
+    if samesite is not None:
+        # 'none' for cross-site access
+        assert (
+            samesite.lower() in COOKIE_SAMESITE
+        ), "samesite must be either 'strict', 'lax' or 'none'"
+        cookie.append(f"SameSite={samesite}")
+
+    return "; ".join(cookie)
@@ -1,19 +1,28 @@
 import http
+import typing
 
 from yaat.responses import TextResponse
 
 
 class HTTPException(Exception):
-    def __init__(self, status_code: int, details: str = None):
+    def __init__(
+        self,
+        status_code: int,
+        details: str = None,
+        headers: typing.Dict[str, str] = None,
+    ):
         if details is None:
             details = http.HTTPStatus(status_code).phrase
         self.status_code = status_code
         self.details = details
+        self.headers = headers
 
     @property
     def response(self) -> TextResponse:
         return TextResponse(
-            status_code=self.status_code, content=self.details,
+            status_code=self.status_code,
+            content=self.details,
+            headers=dict(self.headers) if self.headers else None,
         )
 
     def __repr__(self) -> str:
@@ -0,0 +1,78 @@
+import asyncio
+import typing
+
+from yaat.exceptions import HTTPException
+
+
+class MemoryBudget:
+    """
+    Process-wide budget of request body bytes held in memory, shared by
+    request streams, buffered bodies and uploaded files. Once it is used up,
+    requests wait before receiving more body and uploaded files are written
+    to disk. Requests still waiting after `timeout` get 503.
+    """
+
+    def __init__(self, limit: int = None, timeout: float = 30):
+        self.limit = limit  # bytes, None for no limit
+        self.timeout = timeout  # seconds
+        self.in_use = 0
+        self.peak = 0
+        self.waiting = 0
+        self._waiters = []  # futures of requests waiting for memory
+
+    @property
+    def exhausted(self) -> bool:
+        return self.limit is not None and self.in_use >= self.limit
+
+    def metrics(self) -> typing.Dict[str, typing.Any]:
+        return {
+            "limit": self.limit,
+            "in_use": self.in_use,
+            "peak": self.peak,
+            "waiting": self.waiting,
+        }
+
+    def acquire(self, size: int):
+        # never blocks, call wait() before receiving more data
+        self.in_use += size
+        if self.in_use > self.peak:
+            self.peak = self.in_use
+
+    def release(self, size: int):
+        if not size:
+            return
+
+        self.in_use -= size
+        if not self.exhausted:
+            waiters, self._waiters = self._waiters, []
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_result(None)
+
+    async def wait(self):
+        """
+        Wait until memory is released, raise 503 if it takes too long.
+        """
+        if not self.exhausted:
+            return
+
+        loop = asyncio.get_event_loop()
+        deadline = loop.time() + self.timeout
+        self.waiting += 1
+        try:
+            while self.exhausted:
+                waiter = loop.create_future()
+                self._waiters.append(waiter)
+                try:
+                    await asyncio.wait_for(waiter, deadline - loop.time())
+                except asyncio.TimeoutError:
+                    raise HTTPException(503)
+                finally:
+                    if waiter in self._waiters:
+                        self._waiters.remove(waiter)
+        finally:
+            self.waiting -= 1
+
+
+# shared by every application in the process
+body_memory = MemoryBudget()
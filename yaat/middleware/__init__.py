@@ -1,3 +1,4 @@
+from yaat.middleware.asgi import ASGIMiddleware
 from yaat.middleware.base import BaseMiddleware
 from yaat.middleware.cors import CORSMiddleware
 from yaat.middleware.exception import ExceptionMiddleware
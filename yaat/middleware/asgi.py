@@ -0,0 +1,15 @@
+from yaat.typing import ASGIApp, Scope, Send, Receive
+
+
+class ASGIMiddleware:
+    """
+    Middleware wrapping the ASGI application instead of handling Request
+    and Response, so it can see every message of streamed responses
+    without buffering the body. It receives lifespan events as well.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        await self.app(scope, receive, send)
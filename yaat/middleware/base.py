@@ -1,3 +1,4 @@
+import copy
 import typing
 
 from yaat.requests import Request
@@ -13,6 +14,13 @@ class BaseMiddleware:
     def add(self, middleware_cls: typing.Type, *args, **kwargs):
         self.app = middleware_cls(self.app, *args, **kwargs)
 
+    def compile(self):
+        """
+        Flatten middlewares wrapped by this middleware,
+        no more middleware should be added after.
+        """
+        self.app = compile_middlewares(self.app)
+
     async def process_request(self, request: Request):
         pass
 
@@ -36,5 +44,95 @@ class BaseMiddleware:
         # Handle Request
         else:
             request = Request(scope, receive)
-            response = await self.handle_request(request)
-            await response(scope, receive, send)
+            try:
+                response = await self.handle_request(request)
+                await response(scope, receive, send)
+            finally:
+                request.release_memory()
+
+
+def overrides(middleware: BaseMiddleware, method: str) -> bool:
+    return getattr(type(middleware), method) is not getattr(
+        BaseMiddleware, method
+    )
+
+
+def is_hooks_only(middleware: typing.Any) -> bool:
+    """
+    Middleware only overriding process_request and process_response.
+    """
+    return (
+        isinstance(middleware, BaseMiddleware)
+        and not overrides(middleware, "handle_request")
+        and not overrides(middleware, "handle_websocket")
+    )
+
+
+class MiddlewarePipeline:
+    """
+    Hooks of consecutive middlewares run in one loop instead of
+    a coroutine per middleware. Request hooks run from the outermost
+    middleware and response hooks from the innermost, same as nested.
+    """
+
+    def __init__(self, middlewares: typing.List[BaseMiddleware], app: ASGIApp):
+        # middlewares are from the outermost to the innermost
+        self.app = app
+        self.request_hooks = tuple(
+            middleware.process_request
+            for middleware in middlewares
+            if overrides(middleware, "process_request")
+        )
+        self.response_hooks = tuple(
+            middleware.process_response
+            for middleware in reversed(middlewares)
+            if overrides(middleware, "process_response")
+        )
+
+    async def handle_request(self, request: Request) -> Response:
+        for hook in self.request_hooks:
+            await hook(request)
+        response = await self.app.handle_request(request)
+        for hook in self.response_hooks:
+            await hook(response)
+        return response
+
+    async def handle_websocket(self, websocket: WebSocket):
+        await self.app.handle_websocket(websocket)
+
+
+def compile_middlewares(app: typing.Any) -> typing.Any:
+    """
+    Compile chain of middlewares wrapped around the application.
+    Consecutive middlewares only overriding the hooks are flattened into
+    a MiddlewarePipeline, middlewares without any hooks are skipped.
+    Middlewares overriding handle_request are copied to wrap the compiled
+    chain, so the original chain is not modified.
+    """
+    layers = []  # from the outermost to the innermost
+    while isinstance(app, BaseMiddleware):
+        layers.append(app)
+        app = app.app
+
+    hooks_only = []
+    for middleware in reversed(layers):
+        if is_hooks_only(middleware):
+            hooks_only.insert(0, middleware)
+            continue
+
+        app = _compile_pipeline(hooks_only, app)
+        hooks_only = []
+        middleware = copy.copy(middleware)
+        middleware.app = app
+        app = middleware
+
+    return _compile_pipeline(hooks_only, app)
+
+
+def _compile_pipeline(
+    middlewares: typing.List[BaseMiddleware], app: typing.Any
+) -> typing.Any:
+    pipeline = MiddlewarePipeline(middlewares, app)
+    if not pipeline.request_hooks and not pipeline.response_hooks:
+        return app
+    return pipeline
@@ -18,6 +18,9 @@ class LifespanMiddleware(BaseMiddleware):
         on_shutdown: typing.Sequence[typing.Callable] = None,
     ):
         super().__init__(app)
+        # application the middlewares are wrapped around,
+        # self.app is replaced by each added middleware
+        self.application = app
         self.on_startup = on_startup if on_startup else []
         self.on_shutdown = on_shutdown if on_shutdown else []
 
@@ -28,6 +31,12 @@ class LifespanMiddleware(BaseMiddleware):
             else:
                 method()
 
+        # compile application after startup handlers,
+        # so they can still register routes
+        freeze = getattr(self.application, "freeze", None)
+        if freeze is not None:
+            freeze()
+
     async def shutdown(self):
         for method in self.on_shutdown:
             if asyncio.iscoroutinefunction(method):
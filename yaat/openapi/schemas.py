@@ -5,7 +5,7 @@ import yaml
 
 from yaat.requests import Request
 from yaat.responses import Response, JSONResponse
-from yaat.routing import Route, Router, RouteTypes
+from yaat.routing import PARAM_REGEX, Route, Router, RouteTypes
 
 
 class RouteInfo:
@@ -98,9 +98,12 @@ class SchemaGenerator:
                 and route.type == RouteTypes.HTTP
                 and route.has_schema
             ):
+                path = route.path
                 # if the route is inside subroute, it will have previous path
                 if prev_path:
                     path = f"{prev_path}{path}"
+                # OpenAPI path template does not have convertor types
+                path = PARAM_REGEX.sub(r"{\1}", path)
 
                 info.append(
                     RouteInfo(path, route.methods, route.handler, route.tags)
@@ -227,7 +230,11 @@ class OpenAPIResponse(Response):
 
 class OpenAPISchema:
     def __init__(
-        self, title: str, description: str = None, version: str = None
+        self,
+        title: str,
+        description: str = None,
+        version: str = None,
+        app: typing.Any = None,
     ):
         base_schema = {
             "openapi": "3.0.0",
@@ -239,16 +246,33 @@ class OpenAPISchema:
             base_schema["info"]["version"] = version
 
         self.schema = SchemaGenerator(base_schema)
+        self.frozen_schemas = {}  # frozen router -> schema
+
+        # generate the schema when application is frozen on startup,
+        # so invalid docstrings fail on startup instead of under load
+        if app is not None:
+            app.add_freeze_hook(self.compile)
+
+    def compile(self, app: typing.Any):
+        self.get_router_schema(app.router)
 
     def get_schema(self, routes: typing.List[Route]) -> typing.Dict:
         return self.schema.get_schema(routes)
 
+    def get_router_schema(self, router: Router) -> typing.Dict:
+        if not router.frozen:
+            return self.get_schema(router.routes)
+
+        # routes can not change once router is frozen,
+        # so generate the schema only once
+        if router not in self.frozen_schemas:
+            self.frozen_schemas[router] = self.get_schema(router.routes)
+        return self.frozen_schemas[router]
+
     def JSONResponse(self, request: Request) -> JSONResponse:
-        routes = request.app.router.routes
-        schema = self.get_schema(routes)
+        schema = self.get_router_schema(request.app.router)
         return JSONResponse(schema)
 
     def Response(self, request: Request) -> Response:
-        routes = request.app.router.routes
-        schema = self.get_schema(routes)
+        schema = self.get_router_schema(request.app.router)
         return OpenAPIResponse(schema)
@@ -7,6 +7,7 @@ import typing
 
 from yaat.components import Form, Headers, UploadFile
 from yaat.constants import ENCODING_METHOD
+from yaat.exceptions import HTTPException
 
 
 class FormParser:
@@ -173,56 +174,62 @@ class MultiPartParser:
 
 class UrlParamParser:
     """
-    To convert URL parameter datatypes to what annotation defines
+    To convert URL parameter datatypes to what annotation defines.
+    Conversion plan is compiled once when the route is registered,
+    so only the conversions run on each request.
     """
 
     def __init__(
         self,
         handler: typing.Callable,
-        kwargs: typing.Dict[str, str],
         is_class: bool,
+        error_status: int = None,
+        ignore_params: typing.Sequence[str] = (),
     ):
         specs = inspect.getfullargspec(handler)
         # if class, ignore first 2 params (self, request) else 1 (request)
         args_index = 2 if is_class else 1
+        args = specs.args[args_index:] + specs.kwonlyargs
 
-        self.convertors = {
+        convertors = {
             "int": self.to_interger,
             "float": self.to_float,
             "str": self.to_string,
         }
-        self.args = specs.args[args_index:]
-        self.annotations = specs.annotations
-        self.kwargs = kwargs
-
-        self.parse()
-
-    def get(self) -> typing.Dict[str, typing.Any]:
-        return self.kwargs
-
-    def parse(self):
-        kwargs = self.kwargs
+        self.convertors = tuple(
+            (
+                param,
+                convertors.get(
+                    getattr(dtype, "__name__", None), self.to_string
+                ),
+            )
+            for param, dtype in specs.annotations.items()
+            if param in args and param not in ignore_params
+        )
+        # HTTP status to respond with when conversion fails,
+        # if not given, the raw string is passed through
+        self.error_status = error_status
 
+    def parse(
+        self, kwargs: typing.Dict[str, str]
+    ) -> typing.Dict[str, typing.Any]:
         # convert to the datatype annoation defined
-        for param, dtype in self.annotations.items():
-            if param in kwargs.keys():
-                value = kwargs[param]
-                convertor = self.convertors.get(dtype.__name__, self.to_string)
-                kwargs[param] = convertor(value)
+        for param, convertor in self.convertors:
+            if param not in kwargs:
+                continue
+            try:
+                kwargs[param] = convertor(kwargs[param])
+            except (TypeError, ValueError):
+                if self.error_status is not None:
+                    raise HTTPException(self.error_status)
 
-        self.kwargs = kwargs
+        return kwargs
 
     def to_interger(self, value: str) -> int:
-        try:
-            return int(value)
-        except (TypeError, ValueError):
-            return value
+        return int(value)
 
-    def to_float(self, value: str) -> int:
-        try:
-            return float(value)
-        except (TypeError, ValueError):
-            return value
+    def to_float(self, value: str) -> float:
+        return float(value)
 
     def to_string(self, value: typing.Any) -> str:
         return str(value)
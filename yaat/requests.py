@@ -1,22 +1,51 @@
 from multipart.multipart import parse_options_header
-import http.cookies
-import json
+import asyncio
+import inspect
 import typing
 
-from yaat.components import Address, Form, Headers, QueryParams, URL
+from yaat.components import (
+    NOT_LOADED,
+    Address,
+    Form,
+    Headers,
+    QueryParams,
+    UploadFile,
+    URL,
+)
+from yaat.cookies import Cookies
+from yaat.concurrency import run_in_threadpool
 from yaat.constants import ENCODING_METHOD
+from yaat.exceptions import HTTPException
+from yaat.memory import body_memory
 from yaat.parsers import FormParser, MultiPartParser
+from yaat.serializers import get_json_codec
 from yaat.typing import Scope, Receive, Send, Message
 
 
+# Content-Length is only trusted up to this size to preallocate the body,
+# as it is allocated before any of the body is received. Larger bodies
+# grow as they are received.
+BODY_PREALLOCATE_SIZE = 1024 * 1024
+# size of chunks read back from replayable stream
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
 async def empty_receive() -> Message:
     raise RuntimeError("Receive channel has not been made available")
 
 
 class HTTPConnection:
+    # slots keep per connection objects small, custom values
+    # should be stored in the scope instead
+    __slots__ = ("scope", "_url", "_headers", "_query_params", "_cookies")
+
     def __init__(self, scope: Scope):
         assert scope["type"] in ("http", "websocket")
         self.scope = scope
+        self._url = None
+        self._headers = None
+        self._query_params = None
+        self._cookies = None
 
     def __getitem__(self, key: str) -> str:
         return self.scope[key]
@@ -41,37 +70,26 @@ class HTTPConnection:
 
     @property
     def url(self) -> URL:
-        if not hasattr(self, "_url"):
-            self._url = URL(scope=self.scope)
+        if self._url is None:
+            self._url = URL(scope=self.scope, headers=self.headers)
         return self._url
 
     @property
     def headers(self) -> Headers:
-        if not hasattr(self, "_headers"):
+        if self._headers is None:
             self._headers = Headers(self.scope["headers"])
         return self._headers
 
     @property
     def query_params(self) -> QueryParams:
-        if not hasattr(self, "_query_params"):
+        if self._query_params is None:
             self._query_params = QueryParams(self.scope["query_string"])
         return self._query_params
 
     @property
-    def cookies(self) -> typing.Dict[str, str]:
-        if not hasattr(self, "_cookies"):
-            cookies = {}
-            raw_cookies = self.headers.get("cookie")
-
-            if raw_cookies:
-                cookie = http.cookies.SimpleCookie()
-                cookie.load(raw_cookies)
-
-                for key, data in cookie.items():
-                    cookies[key] = data.value
-
-            self._cookies = cookies
-
+    def cookies(self) -> Cookies:
+        if self._cookies is None:
+            self._cookies = Cookies(self.headers.get("cookie"))
         return self._cookies
 
     @property
@@ -81,57 +99,326 @@ class HTTPConnection:
 
 
 class Request(HTTPConnection):
+    __slots__ = (
+        "receive",
+        "max_body_size",
+        "_memory",
+        "_body",
+        "_spool",
+        "_spool_size",
+        "_spool_complete",
+        "_json",
+        "_form",
+        "_message",
+        "_disconnected",
+    )
+
     def __init__(
         self, scope: Scope, receive: Receive = empty_receive,
     ):
         super().__init__(scope)
         self.receive = receive
+        self.max_body_size = None
+        self._memory = 0  # bytes of the body held in body memory
+        self._body = None
+        self._spool = None  # received body kept by replayable stream
+        self._spool_size = 0
+        self._spool_complete = False
+        self._json = NOT_LOADED
+        self._form = None
+        self._message = None  # received by is_disconnected before the body
+        self._disconnected = False
         assert scope["type"] == "http"
 
-    @property
-    def receive(self) -> Receive:
-        return self.__receive
-
-    @receive.setter
-    def receive(self, receive: Receive):
-        self.__receive = receive
-
-    async def stream(self) -> typing.AsyncGenerator[bytes, None]:
-        if hasattr(self, "_body"):
+    def limit_body_size(self, max_body_size: int):
+        """
+        Respond with 413 if the body is larger than the limit, either
+        declared by Content-Length or counted while the body is received.
+        """
+        self.max_body_size = max_body_size
+
+        content_length = self.headers.get("content-length")
+        if (
+            content_length is not None
+            and content_length.isdigit()
+            and int(content_length) > max_body_size
+        ):
+            raise HTTPException(413)
+
+    def stream(
+        self, replay: bool = False
+    ) -> typing.AsyncGenerator[bytes, None]:
+        """
+        Stream the body as it is received. With replay, the received body is
+        kept in memory, or on disk once large, so the stream can be read
+        again by other consumers such as form().
+        """
+        return self._stream(replay)
+
+    async def _stream(
+        self, replay: bool = False, keep: bool = False
+    ) -> typing.AsyncGenerator[bytes, None]:
+        # with keep, chunks stay in body memory until the request is finished
+        if self._body is not None:
             yield self._body
             yield b""
             return
 
+        if replay and self._spool is None:
+            self._spool = UploadFile("body")
+
+        received = 0
+        if self._spool is not None:
+            # read back what is received so far, then continue receiving
+            while received < self._spool_size:
+                await self._spool.seek(received)
+                chunk = await self._spool.read(
+                    min(STREAM_CHUNK_SIZE, self._spool_size - received)
+                )
+                received += len(chunk)
+                if keep:
+                    self._memory += len(chunk)
+                    body_memory.acquire(len(chunk))
+                yield chunk
+            if self._spool_complete:
+                yield b""
+                return
+
+        if received == 0 and not self._memory:
+            # wait for body memory before the body is received, requests
+            # already receiving or holding body never wait for themselves
+            await body_memory.wait()
+
         while True:
-            message = await self.receive()
+            if self._message is not None:
+                message, self._message = self._message, None
+            else:
+                message = await self.receive()
+            if message["type"] == "http.disconnect":
+                self._disconnected = True
             body = message.get("body", b"")
             if body:
-                yield body
+                received += len(body)
+                if (
+                    self.max_body_size is not None
+                    and received > self.max_body_size
+                ):
+                    # stop before the rest of the body is received
+                    raise HTTPException(413)
+
+                if self._spool is not None:
+                    await self._spool.seek(self._spool_size)
+                    await self._spool.write(body)
+                    self._spool_size += len(body)
+
+                body_memory.acquire(len(body))
+                if keep:
+                    self._memory += len(body)
+                    yield body
+                else:
+                    try:
+                        yield body
+                    finally:
+                        body_memory.release(len(body))
             if not message.get("more_body", False):
                 break
 
+        if self._spool is not None:
+            self._spool_complete = True
         yield b""
 
-    async def body(self) -> bytes:
-        if not hasattr(self, "_body"):
-            chunks = []
-            async for chunk in self.stream():
-                chunks.append(chunk)
-            self._body = b"".join(chunks)
+    async def read_body(self) -> typing.Union[bytes, bytearray]:
+        """
+        Receive the body into a single buffer, preallocated from
+        Content-Length so chunks are copied into it only once.
+        """
+        if self._body is not None:
+            return self._body
+
+        content_length = self.headers.get("content-length")
+        size = 0
+        if content_length is not None and content_length.isdigit():
+            size = min(int(content_length), BODY_PREALLOCATE_SIZE)
+
+        buffer = bytearray(size)
+        position = 0
+        async for chunk in self._stream(keep=True):
+            end = position + len(chunk)
+            if end <= len(buffer):
+                buffer[position:end] = chunk
+            else:
+                del buffer[position:]
+                buffer += chunk
+            position = end
 
+        # less body than Content-Length
+        del buffer[position:]
+        self._body = buffer
         return self._body
 
+    async def body(self) -> bytes:
+        body = await self.read_body()
+        if not isinstance(body, bytes):
+            # buffer is replaced, so the body is only kept once
+            self._body = body = bytes(body)
+        return body
+
+    async def body_view(self) -> memoryview:
+        """
+        Read-only view of the body without copying it to bytes.
+        """
+        view = memoryview(await self.read_body())
+        # toreadonly is added in python3.8
+        if hasattr(view, "toreadonly"):
+            view = view.toreadonly()
+        return view
+
+    async def body_into(self, file: typing.Any) -> int:
+        """
+        Write the body to the file or buffer as it is received, without
+        keeping the whole body in memory. Return size of the body.
+        """
+        size = 0
+        async for chunk in self.stream():
+            if not chunk:
+                continue
+            size += len(chunk)
+            if inspect.iscoroutinefunction(file.write):
+                await file.write(chunk)
+            else:
+                await run_in_threadpool(file.write, chunk)
+        return size
+
+    async def is_disconnected(self) -> bool:
+        """
+        Check if client has disconnected without waiting for it.
+        """
+        if self._disconnected or self._message is not None:
+            return self._disconnected
+
+        receiving = asyncio.ensure_future(self.receive())
+        # let receive return message which is already available
+        await asyncio.sleep(0)
+        if not receiving.done():
+            receiving.cancel()
+            return False
+
+        message = receiving.result()
+        if message["type"] == "http.disconnect":
+            self._disconnected = True
+        else:
+            # keep the body for stream()
+            self._message = message
+        return self._disconnected
+
+    async def run_until_disconnect(
+        self, handler: typing.Awaitable[typing.Any]
+    ) -> typing.Any:
+        """
+        Run handler while listening for client to disconnect. Handler is
+        cancelled on disconnect, and 499 Client Closed Request is raised.
+        """
+        receive = self.receive
+        # body is passed to the handler while disconnect is listened for,
+        # unbounded so disconnect is still received if body is not read
+        messages = asyncio.Queue()
+
+        def release_message(message: Message):
+            size = len(message.get("body", b""))
+            self._memory -= size
+            body_memory.release(size)
+
+        async def receive_message() -> Message:
+            message = await messages.get()
+            release_message(message)
+            return message
+
+        self.receive = receive_message
+
+        def put_message(message: Message):
+            # held by the request until handler receives it
+            size = len(message.get("body", b""))
+            self._memory += size
+            body_memory.acquire(size)
+            messages.put_nowait(message)
+
+        async def listen_disconnect():
+            body_complete = False
+            if self._message is not None:
+                put_message(self._message)
+                body_complete = not self._message.get("more_body", False)
+                self._message = None
+            while not self._disconnected:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    self._disconnected = True
+                elif body_complete:
+                    # server sends more messages after the body instead of
+                    # waiting for disconnect, such as the test client
+                    return
+                else:
+                    put_message(message)
+                    body_complete = not message.get("more_body", False)
+
+        handling = asyncio.ensure_future(handler)
+        listening = asyncio.ensure_future(listen_disconnect())
+        try:
+            await asyncio.wait(
+                (handling, listening), return_when=asyncio.FIRST_COMPLETED
+            )
+            if (
+                listening.done()
+                and not self._disconnected
+                and listening.exception() is None
+            ):
+                # disconnect can not be listened for, let handler finish
+                await asyncio.wait((handling,))
+        finally:
+            self.receive = receive
+            listening.cancel()
+            if not handling.done():
+                handling.cancel()
+                # let handler clean up, such as closing its connections
+                await asyncio.wait((handling,))
+            while not messages.empty():
+                release_message(messages.get_nowait())
+
+        if listening.done() and not listening.cancelled():
+            # errors of receive are raised instead of 499
+            listening.result()
+        if handling.cancelled():
+            raise HTTPException(499, "Client Closed Request")
+        return handling.result()
+
+    def release_memory(self):
+        """
+        Release body memory held by the body and uploaded files,
+        called when the request is finished.
+        """
+        body_memory.release(self._memory)
+        self._memory = 0
+
+        if self._spool is not None:
+            self._spool.release_memory()
+            self._spool.file.close()
+            self._spool = None
+
+        if self._form is not None:
+            for _, value in self._form.items(multi=True):
+                if isinstance(value, UploadFile):
+                    value.release_memory()
+
     async def json(self) -> typing.Any:
-        if not hasattr(self, "_json"):
-            body = await self.body()
+        if self._json is NOT_LOADED:
+            body = await self.read_body()
             self._json = {}
 
             if not body == b"":
-                self._json = json.loads(body)
+                self._json = get_json_codec().loads(body)
         return self._json
 
     async def form(self) -> typing.Dict[str, typing.Any]:
-        if not hasattr(self, "_form"):
+        if self._form is None:
             content_type, options = parse_options_header(
                 self.headers.get("content-type")
             )
@@ -141,7 +428,7 @@ class Request(HTTPConnection):
                 self._form = await multipart_parser.parse()
 
             elif content_type == b"application/x-www-form-urlencoded":
-                form_parser = FormParser(self.body)
+                form_parser = FormParser(self.read_body)
                 self._form = await form_parser.parse()
 
             else:
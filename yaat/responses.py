@@ -3,22 +3,17 @@ from mimetypes import guess_type
 from urllib.parse import quote, quote_plus
 import aiofiles
 import hashlib
-import http.cookies
 import inspect
-import json
 import os
 import typing
 
 from yaat.concurrency import generate_in_threadpool, run_until_first_complete
 from yaat.constants import ENCODING_METHOD
+from yaat.cookies import serialize_cookie
+from yaat.serializers import get_json_codec
 from yaat.typing import Scope, Receive, Send
 
 
-# Workaround for adding samesite support to python versions below 3.8
-# https://stackoverflow.com/a/50813092
-http.cookies.Morsel._reserved["samesite"] = "SameSite"
-
-
 class Response:
     media_type = None
     charset = "utf-8"
@@ -34,6 +29,7 @@ class Response:
         if media_type is not None:
             self.media_type = media_type
         self.headers = headers if headers is not None else {}
+        self.cookie_headers = []  # values of Set-Cookie headers
         self.body = self.render_content(content)
 
     def render_content(self, content: typing.Any) -> bytes:
@@ -48,6 +44,9 @@ class Response:
     ) -> typing.List[str]:
         if headers is None:
             headers = self.headers
+            cookie_headers = getattr(self, "cookie_headers", [])
+        else:
+            cookie_headers = []
 
         if headers is None:
             raw_headers = []  # type: typing.List[typing.Tuple[bytes, bytes]]
@@ -77,6 +76,9 @@ class Response:
                 (b"content-type", content_type.encode(ENCODING_METHOD))
             )
 
+        for cookie in cookie_headers:
+            raw_headers.append((b"set-cookie", cookie.encode(ENCODING_METHOD)))
+
         return raw_headers
 
     def set_cookie(
@@ -91,31 +93,20 @@ class Response:
         httponly: bool = False,
         samesite: str = "lax",
     ):
-        cookie: http.cookies.BaseCookie = http.cookies.SimpleCookie()
-        cookie[key] = value
-        if max_age is not None:
-            cookie[key]["max-age"] = max_age
-        if expires is not None:
-            cookie[key]["expires"] = expires
-        if path is not None:
-            cookie[key]["path"] = path
-        if domain is not None:
-            cookie[key]["domain"] = domain
-        if secure:
-            cookie[key]["secure"] = True
-        if httponly:
-            cookie[key]["httponly"] = True
-        if samesite is not None:
-            # 'none' for cross-site access
-            assert samesite.lower() in [
-                "strict",
-                "lax",
-                "none",
-            ], "samesite must be either 'strict', 'lax' or 'none'"
-
-            cookie[key]["samesite"] = samesite
-
-        self.headers["set-cookie"] = cookie.output(header="").strip()
+        # each cookie is sent in its own Set-Cookie header
+        self.cookie_headers.append(
+            serialize_cookie(
+                key=key,
+                value=value,
+                max_age=max_age,
+                expires=expires,
+                path=path,
+                domain=domain,
+                secure=secure,
+                httponly=httponly,
+                samesite=samesite,
+            )
+        )
 
     def delete_cookie(self, key: str, path: str = "/", domain: str = None):
         self.set_cookie(
@@ -145,13 +136,7 @@ class JSONResponse(Response):
     media_type = "application/json"
 
     def render_content(self, content: typing.Any) -> bytes:
-        return json.dumps(
-            content,
-            ensure_ascii=False,
-            allow_nan=False,
-            indent=None,
-            separators=(",", ":"),
-        ).encode("utf-8")
+        return get_json_codec().dumps(content)
 
 
 class RedirectResponse(Response):
@@ -188,6 +173,7 @@ class FileResponse(Response):
         if media_type is None:
             media_type = guess_type(filename or str(path))[0] or "text/plain"
         self.headers = headers if headers is not None else {}
+        self.cookie_headers = []
         self.media_type = media_type
         self.stat_result = stat_result
 
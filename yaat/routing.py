@@ -1,19 +1,97 @@
 from collections import OrderedDict
 from enum import Enum
-from parse import parse
+import copy
 import inspect
+import re
 import typing
 
 from yaat.constants import HTTP_METHODS
+from yaat.convertors import CONVERTORS, Convertor
+from yaat.exceptions import HTTPException
+from yaat.middleware.base import compile_middlewares
+from yaat.parsers import UrlParamParser
+from yaat.requests import Request
+from yaat.responses import Response
+from yaat.typing import ASGIApp, Receive, Scope, Send
+from yaat.websockets import WebSocket
+
+
+# matches "{name}" or "{name:type}" inside a route path
+PARAM_REGEX = re.compile(r"{([^{}:]+)(?::([^{}]*))?}")
+
+# websocket routes are indexed with HTTP routes under this method
+WEBSOCKET_METHOD = "WEBSOCKET"
 
 
 class RouteTypes(Enum):
     HTTP = 1  # http route
     STATIC = 2  # static handler route
     WEBSOCKET = 3  # websocket route
+    ASGI = 4  # raw ASGI app route
+    MOUNT = 5  # ASGI app handles all paths under the prefix
+
+
+# routes dispatched to ASGI apps without Request and Response objects
+ASGI_ROUTE_TYPES = (RouteTypes.ASGI, RouteTypes.MOUNT)
+
+
+class HandlerPool:
+    """
+    Reuse class based handler instances instead of creating one on every request.
+    Instance is taken out of the pool while handling the request, so it is
+    never shared by concurrent requests.
+    """
+
+    def __init__(self, handler: typing.Type, size: int):
+        self.handler = handler
+        self.size = size
+        self.instances = [handler() for _ in range(size)]
+
+    def acquire(self) -> typing.Any:
+        if self.instances:
+            return self.instances.pop()
+        return self.handler()
+
+    def release(self, instance: typing.Any):
+        if len(self.instances) < self.size:
+            self.instances.append(instance)
+
+
+class RouteEndpoint:
+    """
+    Innermost application of route middlewares, calls the route handler.
+    Path parameters are passed through middlewares in the request scope.
+    """
+
+    def __init__(self, route: "Route"):
+        self.route = route
+
+    async def handle_request(self, request: Request) -> Response:
+        return await self.route.call_endpoint(
+            request, request.scope["path_params"]
+        )
+
+    async def handle_websocket(self, websocket: WebSocket):
+        await self.route.handler(websocket)
 
 
 class Route:
+    __slots__ = (
+        "route_type",
+        "path",
+        "handler",
+        "__methods",
+        "has_schema",
+        "tags",
+        "endpoints",
+        "allow",
+        "handler_pool",
+        "middlewares",
+        "middleware",
+        "max_body_size",
+        "cancel_on_disconnect",
+    )
+
     def __init__(
         self,
         route_type: RouteTypes,
@@ -22,8 +100,16 @@ class Route:
         methods: typing.List[str] = None,
         has_schema: bool = False,
         tags: typing.List[str] = None,
+        invalid_param_status: int = None,
+        handler_pool_size: int = None,
+        middlewares: typing.Sequence[typing.Callable] = None,
+        max_body_size: int = None,
+        cancel_on_disconnect: bool = None,
     ):
-        if inspect.isclass(handler):
+        if route_type in ASGI_ROUTE_TYPES:
+            # ASGI apps handle every method and websocket by default
+            methods = methods if methods else HTTP_METHODS + [WEBSOCKET_METHOD]
+        elif inspect.isclass(handler):
             # if handler is class, if will check in function level
             # so allow all HTTP methods
             methods = methods if methods else HTTP_METHODS
@@ -38,6 +124,26 @@ class Route:
         self.methods = methods
         self.has_schema = has_schema
         self.tags = tags if tags else []
+        self._validate_path()
+        self.endpoints = self._compile_endpoints(invalid_param_status)
+        # precomputed for 405 responses
+        self.allow = ", ".join(
+            method for method in self.endpoints if method != WEBSOCKET_METHOD
+        )
+
+        # class based handler is instantiated on every request
+        # unless pool size is given
+        self.handler_pool = None
+        if inspect.isclass(handler) and handler_pool_size:
+            self.handler_pool = HandlerPool(handler, handler_pool_size)
+
+        # middleware chain is composed once, None calls handler directly
+        self.middlewares = list(middlewares) if middlewares else []
+        self.middleware = self._compose_middlewares()
+        # None uses the limit of the router or the application
+        self.max_body_size = max_body_size
+        # None uses the option of the application
+        self.cancel_on_disconnect = cancel_on_disconnect
 
     @property
     def type(self) -> RouteTypes:
@@ -52,39 +158,542 @@ class Route:
         # make sure all HTTP methods are upper
         self.__methods = [method.upper() for method in methods]
 
+    @property
+    def match_methods(self) -> typing.List[str]:
+        """
+        Methods the route is indexed by in the router.
+        """
+        if self.route_type == RouteTypes.WEBSOCKET:
+            return [WEBSOCKET_METHOD]
+        return list(self.endpoints)
+
     def is_valid_method(self, method: str) -> bool:
-        return method.upper() in self.methods
+        return method.upper() in self.endpoints
 
+    def with_router_options(
+        self,
+        middlewares: typing.Sequence[typing.Callable],
+        max_body_size: int = None,
+    ) -> "Route":
+        """
+        Copy of the route with options of the routers it is mounted in.
+        Middlewares wrap outside its own, and max body size is used if
+        the route has none. ASGI apps are called without Request,
+        so neither of them apply.
+        """
+        if self.route_type in ASGI_ROUTE_TYPES:
+            return self
+        if self.max_body_size is not None:
+            max_body_size = None
+        if not middlewares and max_body_size is None:
+            return self
+
+        route = copy.copy(self)
+        if middlewares:
+            route.middlewares = self.middlewares + list(middlewares)
+            route.middleware = route._compose_middlewares()
+        if max_body_size is not None:
+            route.max_body_size = max_body_size
+        return route
+
+    def _compose_middlewares(self) -> typing.Any:
+        if not self.middlewares:
+            return None
+
+        app = RouteEndpoint(self)
+        for middleware in self.middlewares:
+            app = middleware(app)
+        return compile_middlewares(app)
+
+    async def handle(
+        self, request: Request, kwargs: typing.Dict[str, typing.Any]
+    ) -> Response:
+        if self.middleware is None:
+            return await self.call_endpoint(request, kwargs)
+
+        request.scope["path_params"] = kwargs
+        return await self.middleware.handle_request(request)
+
+    async def handle_websocket(self, websocket: WebSocket):
+        if self.middleware is None:
+            await self.handler(websocket)
+        else:
+            await self.middleware.handle_websocket(websocket)
+
+    async def handle_asgi(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+        kwargs: typing.Dict[str, typing.Any],
+    ):
+        if self.route_type == RouteTypes.MOUNT:
+            # mounted app sees the path under the prefix
+            prefix = kwargs["router_path"]
+            path = scope["path"]
+            if path.startswith(prefix) and prefix != "/":
+                path = path[len(prefix) :]
+            root_path = scope.get("root_path", "")
+            if prefix != "/":
+                root_path += prefix
+            scope = dict(scope, root_path=root_path, path=path or "/")
+        else:
+            scope["path_params"] = kwargs
+
+        await self.handler(scope, receive, send)
+
+    async def call_endpoint(
+        self, request: Request, kwargs: typing.Dict[str, typing.Any]
+    ) -> Response:
+        try:
+            handler, param_parser = self.endpoints[request.method]
+        except KeyError:
+            raise HTTPException(405, headers={"Allow": self.allow})
+
+        # convert url param datatypes to annotation types
+        kwargs = param_parser.parse(kwargs)
+
+        if not inspect.isclass(self.handler):
+            return await handler(request, **kwargs)
+
+        if self.handler_pool is None:
+            return await handler(self.handler(), request, **kwargs)
+
+        instance = self.handler_pool.acquire()
+        try:
+            return await handler(instance, request, **kwargs)
+        finally:
+            self.handler_pool.release(instance)
+
+    def _validate_path(self):
+        """
+        Compile path parameters once, so invalid route syntax
+        fails on registration instead of on the first request.
+        """
+        segments = path_to_segments(self.path)
+        for index, segment in enumerate(segments):
+            match = PARAM_REGEX.fullmatch(segment)
+            if match and match.group(2) == "path":
+                assert (
+                    index == len(segments) - 1
+                ), "'path' convertor must take the whole last segment"
+            elif PARAM_REGEX.search(segment):
+                RouteParam(segment)
+
+    def _compile_endpoints(
+        self, error_status: int = None
+    ) -> typing.Dict[str, typing.Tuple[typing.Callable, UrlParamParser]]:
+        """
+        Compile handler and URL parameter convertors of each HTTP method,
+        so they are not looked up again on every request.
+        """
+        if self.route_type == RouteTypes.WEBSOCKET:
+            return {}
+
+        if self.route_type in ASGI_ROUTE_TYPES:
+            return {method: (self.handler, None) for method in self.methods}
+
+        # params typed in route syntax are already converted while matching
+        typed_params = [
+            match.group(1)
+            for match in PARAM_REGEX.finditer(self.path)
+            if match.group(2)
+        ]
+
+        if not inspect.isclass(self.handler):
+            parser = UrlParamParser(
+                self.handler, False, error_status, typed_params
+            )
+            return {method: (self.handler, parser) for method in self.methods}
+
+        endpoints = {}
+        for method in self.methods:
+            # unbound method, called with handler instance
+            handler = getattr(self.handler, method.lower(), None)
+            if handler is not None:
+                parser = UrlParamParser(
+                    handler, True, error_status, typed_params
+                )
+                endpoints[method] = (handler, parser)
+        return endpoints
+
+
+def path_to_segments(path: str) -> typing.List[str]:
+    return [segment for segment in path.split("/") if segment != ""]
+
+
+class RouteParam:
+    """
+    Compiled path parameter segment, either a whole segment "{name:type}"
+    or a segment mixed with literal text such as "{name}.txt".
+    Values are validated by the convertor regex and converted while matching.
+    """
+
+    def __init__(self, segment: str):
+        self.segment = segment
+        self.convertors = {}  # name -> Convertor
+
+        match = PARAM_REGEX.fullmatch(segment)
+        if match and self._get_convertor(match) is CONVERTORS["str"]:
+            # whole segment string capture, no regex needed
+            self.convertors[match.group(1)] = CONVERTORS["str"]
+            self.regex = None
+            return
+
+        pattern = ""
+        index = 0
+        for match in PARAM_REGEX.finditer(segment):
+            name = match.group(1)
+            convertor = self._get_convertor(match)
+            assert (
+                convertor is not CONVERTORS["path"]
+            ), "'path' convertor must take the whole last segment"
+
+            pattern += re.escape(segment[index : match.start()])
+            pattern += f"(?P<{name}>{convertor.regex})"
+            self.convertors[name] = convertor
+            index = match.end()
+        pattern += re.escape(segment[index:])
+        self.regex = re.compile(pattern)
+
+    def _get_convertor(self, match: typing.Match) -> Convertor:
+        convertor_type = match.group(2) or "str"
+        assert (
+            convertor_type in CONVERTORS
+        ), f"Unknown path convertor '{convertor_type}'"
+        return CONVERTORS[convertor_type]
+
+    def match(
+        self, segment: str
+    ) -> typing.Optional[typing.Dict[str, typing.Any]]:
+        if self.regex is None:
+            return {name: segment for name in self.convertors}
+
+        match = self.regex.fullmatch(segment)
+        if match is None:
+            return None
+
+        return {
+            name: self.convertors[name].convert(value)
+            for name, value in match.groupdict().items()
+        }
+
+
+class RouteNode:
+    """
+    Single path segment inside the compiled route tree.
+    """
+
+    def __init__(self):
+        self.children = {}  # static segment -> RouteNode
+        self.params = []  # [(RouteParam, RouteNode)]
+        self.path_params = []  # [(name, RouteNode)] capture remaining path
+        self.routes = {}  # method -> route ends at this segment
+        self.allow = ""  # HTTP methods of routes ending at this segment
+        self.prefix_route = None  # route handles all paths under this segment
+
+    def add_route(self, route: "Route"):
+        for method in route.match_methods:
+            self.routes.setdefault(method, route)
+        self.allow = ", ".join(
+            method for method in self.routes if method != WEBSOCKET_METHOD
+        )
+
+    def get_route(self, method: str = None) -> "Route":
+        if method is None:
+            return next(iter(self.routes.values()), None)
+        return self.routes.get(method)
+
+    def get_child(self, segment: str) -> "RouteNode":
+        if PARAM_REGEX.search(segment) is None:
+            if segment not in self.children:
+                self.children[segment] = RouteNode()
+            return self.children[segment]
+
+        match = PARAM_REGEX.fullmatch(segment)
+        if match and match.group(2) == "path":
+            name = match.group(1)
+            for param_name, node in self.path_params:
+                if param_name == name:
+                    return node
+            node = RouteNode()
+            self.path_params.append((name, node))
+            return node
+
+        for param, node in self.params:
+            if param.segment == segment:
+                return node
+
+        node = RouteNode()
+        self.params.append((RouteParam(segment), node))
+        return node
+
+    def freeze(self):
+        self.params = tuple(self.params)
+        self.path_params = tuple(self.path_params)
+        for _, node in self.params + self.path_params:
+            node.freeze()
+        for node in self.children.values():
+            node.freeze()
+
+
+class RouteTree:
+    """
+    Segment trie compiled from the router's routes.
+    Static segments are dictionary lookups and path parameters are
+    compiled captures, so lookup cost depends on the depth of
+    the requested path instead of the number of routes.
+    """
 
-class Router:
     def __init__(self):
+        self.root = RouteNode()
+        # full path -> node, for routes without path parameters
+        self.static_nodes = {}
+        # requests are only matched before building Request when True
+        self.has_asgi_routes = False
+
+    def _get_node(self, *paths: str) -> RouteNode:
+        node = self.root
+        for path in paths:
+            for segment in path_to_segments(path):
+                node = node.get_child(segment)
+        return node
+
+    def add_route(self, route: "Route", prefix: str = "/"):
+        node = self._get_node(prefix, route.path)
+        node.add_route(route)
+        if route.type in ASGI_ROUTE_TYPES:
+            self.has_asgi_routes = True
+
+        segments = path_to_segments(prefix) + path_to_segments(route.path)
+        if not any(PARAM_REGEX.search(segment) for segment in segments):
+            self.static_nodes["/" + "/".join(segments)] = node
+
+    def add_prefix_route(self, route: "Route", prefix: str):
+        node = self._get_node(prefix)
+        if node.prefix_route is None:
+            node.prefix_route = route
+        if route.type in ASGI_ROUTE_TYPES:
+            self.has_asgi_routes = True
+
+    def freeze(self):
+        self.root.freeze()
+
+    def match(
+        self, path: str, method: str = None
+    ) -> typing.Tuple["Route", typing.Dict[str, typing.Any], str]:
+        """
+        Return matched route and path parameters. If the path matches
+        but none of the routes accept the method, return the allowed
+        methods of the path instead.
+        """
+        # exact match for routes without path parameters first,
+        # static segments always win over path parameters in the tree as well
+        if len(path) > 1 and path.endswith("/"):
+            node = self.static_nodes.get(path[:-1])
+        else:
+            node = self.static_nodes.get(path)
+        if node is not None:
+            route = node.get_route(method)
+            if route is not None:
+                return route, {}, None
+
+        kwargs = {}
+        allow = []  # allowed methods of every path match
+        route = self._match(
+            self.root, path_to_segments(path), 0, kwargs, method, allow
+        )
+        if route is None:
+            return None, None, ", ".join(allow) if allow else None
+        return route, kwargs, None
+
+    @staticmethod
+    def _add_allow(node: RouteNode, allow: typing.List[str]):
+        for method in node.routes:
+            if method != WEBSOCKET_METHOD and method not in allow:
+                allow.append(method)
+
+    def _match(
+        self,
+        node: RouteNode,
+        segments: typing.List[str],
+        index: int,
+        kwargs: typing.Dict[str, typing.Any],
+        method: str,
+        allow: typing.List[str],
+    ) -> "Route":
+        if index == len(segments) and node.routes:
+            route = node.get_route(method)
+            if route is not None:
+                return route
+            if node.allow:
+                self._add_allow(node, allow)
+
+        if index < len(segments):
+            segment = segments[index]
+
+            # static segments first
+            child = node.children.get(segment)
+            if child is not None:
+                route = self._match(
+                    child, segments, index + 1, kwargs, method, allow
+                )
+                if route is not None:
+                    return route
+
+            # then path parameters
+            for param, child in node.params:
+                values = param.match(segment)
+                if values is None:
+                    continue
+                route = self._match(
+                    child, segments, index + 1, kwargs, method, allow
+                )
+                if route is not None:
+                    kwargs.update(values)
+                    return route
+
+        # then the remaining path, which can not be empty
+        path_params = node.path_params if index < len(segments) else ()
+        for name, child in path_params:
+            route = child.get_route(method)
+            if route is not None:
+                kwargs[name] = "/".join(segments[index:])
+                return route
+            if child.allow:
+                self._add_allow(child, allow)
+
+        # then route handling everything under this segment
+        if node.prefix_route is not None:
+            kwargs["router_path"] = "/" + "/".join(segments[:index])
+            return node.prefix_route
+
+        return None
+
+
+class Router:
+    def __init__(
+        self,
+        middlewares: typing.Sequence[typing.Callable] = None,
+        max_body_size: int = None,
+    ):
         self.routes = OrderedDict()
-        self.__paths = []
+        # wrap every route of the router, including mounted routers
+        self.middlewares = list(middlewares) if middlewares else []
+        # used by routes without their own limit, including mounted routers
+        self.max_body_size = max_body_size
+        self.__paths = {}  # full path -> methods of its routes
+        self.__mounts = []  # [(parent router, prefix)]
+        self.__tree = None
+        self.__frozen = False
 
     @property
-    def paths(self):
-        self.__paths = []  # reset before loading paths
-        return self._get_paths()
+    def frozen(self) -> bool:
+        return self.__frozen
 
-    def _get_paths(
-        self, routes: OrderedDict = None, prev_path: str = None
-    ) -> typing.List[str]:
+    def freeze(self):
         """
-        Method to traverse through routes and sub router inside its to get all handler paths.
+        Compile the route tree of this router, routes can no longer be
+        added or mounted after, to this router or mounted routers.
         """
-        if not routes:
-            routes = self.routes
+        self.__freeze_routes()
+        self.tree.freeze()
+
+    def __freeze_routes(self):
+        if self.__frozen:
+            return
+
+        # routes of mounted routers are served from this router's tree,
+        # so their own trees are not built
+        for router in self.routes.values():
+            if isinstance(router, Router):
+                router.__freeze_routes()
+        self.__frozen = True
 
-        for path, router in routes.items():
-            if isinstance(router, Route):
-                fullpath = (
-                    f"{prev_path}{router.path}" if prev_path else router.path
+    def _check_frozen(self):
+        if self.__frozen:
+            raise RuntimeError("Cannot change routes after router is frozen.")
+
+    @property
+    def tree(self) -> RouteTree:
+        """
+        Compiled route tree, built on first lookup after routes changed.
+        Routes of mounted routers are flattened into the same tree with
+        their prefixes, so nested routers cost nothing at request time.
+        """
+        if self.__tree is None:
+            tree = RouteTree()
+            self._add_to_tree(tree, "/", self.middlewares, self.max_body_size)
+            self.__tree = tree
+        return self.__tree
+
+    def _add_to_tree(
+        self,
+        tree: RouteTree,
+        prefix: str,
+        middlewares: typing.List[typing.Callable],
+        max_body_size: int = None,
+    ):
+        """
+        Add routes with the middlewares of this router and the routers
+        it is mounted in, from the innermost to the outermost.
+        The innermost max body size is used.
+        """
+        for path, router in self.routes.items():
+            if isinstance(router, Route) and router.type == RouteTypes.MOUNT:
+                tree.add_prefix_route(router, self._join_path(prefix, path))
+            elif isinstance(router, Route):
+                tree.add_route(
+                    router.with_router_options(middlewares, max_body_size),
+                    prefix,
+                )
+            elif isinstance(router, Router):
+                router._add_to_tree(
+                    tree,
+                    self._join_path(prefix, path),
+                    router.middlewares + middlewares,
+                    router.max_body_size
+                    if router.max_body_size is not None
+                    else max_body_size,
                 )
-                self.__paths.append(fullpath)
+            # else, mounted object with routes such as static files
             else:
-                self._get_paths(router.routes, path)
+                for route in router.routes.values():
+                    if route.type == RouteTypes.STATIC:
+                        tree.add_prefix_route(
+                            route.with_router_options(
+                                middlewares, max_body_size
+                            ),
+                            self._join_path(prefix, path),
+                        )
+
+    def _reset_tree(self):
+        # routers this router is mounted to have its routes in their tree
+        self.__tree = None
+        for parent, _ in self.__mounts:
+            parent._reset_tree()
+
+    @property
+    def paths(self) -> typing.List[str]:
+        return list(self.__paths)
 
-        return self.__paths
+    def _check_path(self, path: str, methods: typing.Iterable[str]):
+        """
+        Make sure full path is not registered with the same methods
+        in this router or any router it is mounted to.
+        """
+        registered = self.__paths.get(path, ())
+        for method in methods:
+            assert (
+                method not in registered
+            ), f"Route {method} {path}, already exists"
+        for parent, prefix in self.__mounts:
+            parent._check_path(self._join_path(prefix, path), methods)
+
+    def _add_path(self, path: str, methods: typing.Iterable[str]):
+        self.__paths.setdefault(path, set()).update(methods)
+        for parent, prefix in self.__mounts:
+            parent._add_path(self._join_path(prefix, path), methods)
 
     def route(
         self,
@@ -92,6 +701,11 @@ class Router:
         methods: typing.List[str] = None,
         has_schema: bool = False,
         tags: typing.List[str] = None,
+        invalid_param_status: int = None,
+        handler_pool_size: int = None,
+        middlewares: typing.Sequence[typing.Callable] = None,
+        max_body_size: int = None,
+        cancel_on_disconnect: bool = None,
     ) -> typing.Callable:
         def wrapper(handler):
             self.add_route(
@@ -100,6 +714,11 @@ class Router:
                 methods=methods,
                 has_schema=has_schema,
                 tags=tags,
+                invalid_param_status=invalid_param_status,
+                handler_pool_size=handler_pool_size,
+                middlewares=middlewares,
+                max_body_size=max_body_size,
+                cancel_on_disconnect=cancel_on_disconnect,
             )
             return handler
 
@@ -113,24 +732,47 @@ class Router:
         has_schema: bool = False,
         is_static: bool = False,
         tags: typing.List[str] = None,
+        invalid_param_status: int = None,
+        handler_pool_size: int = None,
+        middlewares: typing.Sequence[typing.Callable] = None,
+        max_body_size: int = None,
+        cancel_on_disconnect: bool = None,
     ):
-        assert path not in self.paths, f"Route {path}, already exists"
+        self._check_frozen()
         route_type = RouteTypes.STATIC if is_static else RouteTypes.HTTP
         path = self._clean_path(path)
-        self.routes[path] = Route(
+        route = Route(
             route_type=route_type,
             path=path,
             handler=handler,
             methods=methods,
             has_schema=has_schema,
             tags=tags,
+            invalid_param_status=invalid_param_status,
+            handler_pool_size=handler_pool_size,
+            middlewares=middlewares,
+            max_body_size=max_body_size,
+            cancel_on_disconnect=cancel_on_disconnect,
         )
+        self._add(route)
+
+    def _add(self, route: Route):
+        # same path can have different routes for different methods
+        self._check_path(route.path, route.match_methods)
+        self._add_path(route.path, route.match_methods)
+        self._reset_tree()
+        self.routes[(route.path, tuple(route.match_methods))] = route
 
     def websocket_route(
-        self, path: str, tags: typing.List[str] = None
+        self,
+        path: str,
+        tags: typing.List[str] = None,
+        middlewares: typing.Sequence[typing.Callable] = None,
     ) -> typing.Callable:
         def wrapper(handler):
-            self.add_websocket_route(path=path)
+            self.add_websocket_route(
+                path=path, handler=handler, tags=tags, middlewares=middlewares
+            )
             return handler
 
         return wrapper
@@ -140,99 +782,107 @@ class Router:
         path: str,
         handler: typing.Callable,
         tags: typing.List[str] = None,
+        middlewares: typing.Sequence[typing.Callable] = None,
     ):
-        assert path not in self.paths, f"Route {path}, already exists"
+        self._check_frozen()
         path = self._clean_path(path)
-        self.routes[path] = Route(
+        route = Route(
             route_type=RouteTypes.WEBSOCKET,
             path=path,
             handler=handler,
             tags=tags,
+            middlewares=middlewares,
+        )
+        self._add(route)
+
+    def asgi_route(
+        self, path: str, methods: typing.List[str] = None
+    ) -> typing.Callable:
+        def wrapper(app):
+            self.add_asgi_route(path=path, app=app, methods=methods)
+            return app
+
+        return wrapper
+
+    def add_asgi_route(
+        self, path: str, app: ASGIApp, methods: typing.List[str] = None
+    ):
+        """
+        Route requests to ASGI app without building Request and Response.
+        Path parameters are passed in scope["path_params"].
+        """
+        self._check_frozen()
+        path = self._clean_path(path)
+        route = Route(
+            route_type=RouteTypes.ASGI, path=path, handler=app, methods=methods
+        )
+        self._add(route)
+
+    def mount_asgi(self, app: ASGIApp, prefix: str):
+        """
+        Mount ASGI app to handle all paths under the prefix,
+        the prefix is moved from scope "path" to "root_path".
+        """
+        self._check_frozen()
+        prefix = self._clean_path(prefix)
+        assert (
+            prefix not in self.routes.keys()
+        ), f"Route with {prefix}, already exists"
+
+        self._reset_tree()
+        self.routes[prefix] = Route(
+            route_type=RouteTypes.MOUNT, path=prefix, handler=app
         )
 
     def mount(self, router: typing.Callable, prefix: str):
         """Mount another router"""
+        self._check_frozen()
+        prefix = self._clean_path(prefix)
         assert (
             prefix not in self.routes.keys()
         ), f"Route with {prefix}, already exists"
-        prefix = self._clean_path(prefix)
+
+        if isinstance(router, Router):
+            paths = router.__paths.items()
+        else:
+            paths = [
+                (route.path, route.match_methods)
+                for route in router.routes.values()
+            ]
+        paths = [
+            (self._join_path(prefix, path), methods) for path, methods in paths
+        ]
+
+        for path, methods in paths:
+            self._check_path(path, methods)
+        for path, methods in paths:
+            self._add_path(path, methods)
+
+        # sub router will report routes added after mounting
+        if isinstance(router, Router):
+            router.__mounts.append((self, prefix))
+
+        self._reset_tree()
         self.routes[prefix] = router
 
     def get_route(
-        self,
-        *,
-        request_path: str,
-        prev_path: str = None,
-        routes: OrderedDict = None,
+        self, *, request_path: str, method: str = None
     ) -> (Route, typing.Dict[str, typing.Any]):
-        # NOTE: to prevent circular import
-        from yaat.staticfiles import StaticFiles
-
-        # if not given, use self
-        if not routes:
-            routes = self.routes
-
-        for path, router in routes.items():
-            # if route instance, just loop and search
-            if isinstance(router, Route):
-                route = router
-
-                # for static routing, use different methods for route comparison
-                if route.type == RouteTypes.STATIC:
-                    return route, {"router_path": prev_path}
-
-                parse_result = parse(route.path, request_path)
-                if parse_result is not None:
-                    return route, parse_result.named
-
-            # else, router itself
-            # Type of router
-            #   - Sub Application
-            #   - Static Files Handler
-            else:
-                directories = self._path_to_directories(request_path)
-                first_directory = directories[0]
-
-                # if router is Static Files, and router path is root, means
-                # first directory should be "/" as anything after is filename (with dirs)
-                # for static files handler
-                if path == "/" and isinstance(router, StaticFiles):
-                    first_directory = "/"
-
-                # if first directory not equal to router's path means
-                # the requested url is not for the current router
-                if first_directory != path:
-                    continue
-
-                # reconstruct previous path for next router
-                if prev_path and first_directory != "/":
-                    # if current path is not root, then next previous path
-                    # is current router prex path + current path
-                    next_prev_path = f"{prev_path}{first_directory}"
-                elif prev_path and first_directory == "/":
-                    # because we are not going to add slash to the end,
-                    # so just same previous path for next router
-                    next_prev_path = prev_path
-                else:
-                    # no previous path, means use current path for next
-                    # router
-                    next_prev_path = first_directory
-
-                # request path for next router would be all sub directories
-                # after the current one
-                next_request_path = self._directories_to_path(directories[1:])
-
-                # search in sub router, if route is found return
-                # else continue
-                route, kwargs = self.get_route(
-                    request_path=next_request_path,
-                    prev_path=next_prev_path,
-                    routes=router.routes,
-                )
-                if route:
-                    return route, kwargs
+        """
+        Find the route of the path for the method, any method if not given.
+        Raise 405 if the path only has HTTP routes for other methods.
+        """
+        route, kwargs, allow = self.tree.match(request_path, method)
+        if allow and method != WEBSOCKET_METHOD:
+            raise HTTPException(405, headers={"Allow": allow})
+        return route, kwargs
 
-        return None, None
+    def _join_path(self, prefix: str, path: str) -> str:
+        if prefix == "/":
+            return path
+        if path == "/":
+            return prefix
+        return f"{prefix}{path}"
 
     def _clean_path(self, path: str) -> str:
         if path == "/":
@@ -242,14 +892,3 @@ class Router:
         if path.endswith("/"):
             path = path[:-1]
         return path
-
-    def _path_to_directories(self, path: str) -> typing.List[str]:
-        if path == "/":
-            return ["/"]
-        return [f"/{p}" for p in path.split("/") if p != ""]
-
-    def _directories_to_path(self, directories: typing.List[str]) -> str:
-        url = "".join(directories)
-        if not url.startswith("/"):
-            return f"/{url}"
-        return url
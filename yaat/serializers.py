@@ -0,0 +1,104 @@
+import json
+import typing
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+try:
+    # new module from python 3.7+
+    # https://docs.python.org/3/whatsnew/3.7.html#contextvars
+    import contextvars
+except ImportError:
+    contextvars = None
+
+
+JSONData = typing.Union[bytes, bytearray, memoryview, str]
+
+
+class JSONCodec:
+    """
+    Encode data to JSON bytes and decode JSON bytes with the standard library.
+    """
+
+    def dumps(self, data: typing.Any) -> bytes:
+        return json.dumps(
+            data,
+            ensure_ascii=False,
+            allow_nan=False,
+            indent=None,
+            separators=(",", ":"),
+        ).encode("utf-8")
+
+    def loads(self, data: JSONData) -> typing.Any:
+        if isinstance(data, memoryview):
+            data = bytes(data)
+        return json.loads(data)
+
+
+class ORJSONCodec(JSONCodec):
+    def __init__(self):
+        assert (
+            orjson is not None
+        ), "orjson must be installed to use ORJSONCodec"
+
+    def dumps(self, data: typing.Any) -> bytes:
+        # keep integer keys of dictionaries like the standard library
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+
+    def loads(self, data: JSONData) -> typing.Any:
+        return orjson.loads(data)
+
+
+class UJSONCodec(JSONCodec):
+    def __init__(self):
+        assert ujson is not None, "ujson must be installed to use UJSONCodec"
+
+    def dumps(self, data: typing.Any) -> bytes:
+        return ujson.dumps(
+            data, ensure_ascii=False, escape_forward_slashes=False
+        ).encode("utf-8")
+
+    def loads(self, data: JSONData) -> typing.Any:
+        if not isinstance(data, (bytes, str)):
+            data = bytes(data)
+        return ujson.loads(data)
+
+
+def get_default_codec() -> JSONCodec:
+    """
+    Fastest JSON codec installed, orjson then ujson then the standard library.
+    """
+    if orjson is not None:
+        return ORJSONCodec()
+    if ujson is not None:
+        return UJSONCodec()
+    return JSONCodec()
+
+
+default_codec = get_default_codec()
+
+# codec of the application handling the current request
+if contextvars is not None:
+    current_codec = contextvars.ContextVar("json_codec", default=None)
+else:
+    current_codec = None
+
+
+def get_json_codec() -> JSONCodec:
+    if current_codec is not None:
+        codec = current_codec.get()
+        if codec is not None:
+            return codec
+    return default_codec
+
+
+def set_json_codec(codec: JSONCodec):
+    if current_codec is not None:
+        current_codec.set(codec)
@@ -1,5 +1,4 @@
 import enum
-import json
 import typing
 
 from yaat.constants import (
@@ -8,6 +7,7 @@ from yaat.constants import (
 )
 from yaat.exceptions import WebSocketException
 from yaat.requests import HTTPConnection
+from yaat.serializers import get_json_codec
 from yaat.typing import Message, Scope, Receive, Send
 
 
@@ -32,6 +32,8 @@ class WebSocketDisconnect(Exception):
 
 
 class WebSocket(HTTPConnection):
+    __slots__ = ("__receive", "__send", "client_state", "server_state")
+
     def __init__(self, scope: Scope, receive: Receive, send: Send):
         super().__init__(scope)
         assert scope["type"] == "websocket"
@@ -57,7 +59,7 @@ class WebSocket(HTTPConnection):
             assert message_type in {WsMessages.RECEIVE, WsMessages.DISCONNECT}
 
             if message_type == WsMessages.DISCONNECT:
-                self.cleint_state = WebSocketStates.DISCONNECTED
+                self.client_state = WebSocketStates.DISCONNECTED
             return message
 
         else:
@@ -110,12 +112,12 @@ class WebSocket(HTTPConnection):
 
     async def send_json(self, data: typing.Any, mode: str = "text"):
         assert mode in ["text", "bytes"]
-        raw = json.dumps(data)
+        raw = get_json_codec().dumps(data)
 
         if mode == "text":
-            message = {"type": WsMessages.SEND, "text": raw}
+            message = {"type": WsMessages.SEND, "text": raw.decode("utf-8")}
         else:
-            message = {"type": WsMessages.SEND, "bytes": raw.encode("utf-8")}
+            message = {"type": WsMessages.SEND, "bytes": raw}
 
         await self.send(message)
 
@@ -138,12 +140,9 @@ class WebSocket(HTTPConnection):
 
         message = await self.receive()
         self.__raise_if_disconnected(message)
-        text = (
-            message["text"]
-            if mode == "text"
-            else message["bytes"].decode("utf-8")
-        )
-        return json.loads(text)
+        # codec decodes bytes, so it is not decoded to str first
+        raw = message["text"] if mode == "text" else message["bytes"]
+        return get_json_codec().loads(raw)
 
     # Exception handlers
     def __raise_if_disconnected(self, message: Message):